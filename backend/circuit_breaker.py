@@ -0,0 +1,64 @@
+"""
+Minimal async circuit breaker for the upstream branches of an analysis.
+After `fail_max` consecutive failures the breaker opens and calls fail fast
+with CircuitOpenError for `reset_timeout` seconds; the first call after that
+is let through as a trial and closes the breaker again if it succeeds.
+"""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        fail_max: int = 5,
+        reset_timeout: float = 30.0,
+        is_failure: Callable[[Exception], bool] = lambda e: True,
+    ) -> None:
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        if self.opened_at is not None:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"{self.name} circuit open, skipping call")
+            # Half-open: this call is the trial; everyone else keeps failing
+            # fast until it settles
+            self.opened_at = time.monotonic()
+
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.failures += 1
+                if self.opened_at is not None or self.failures >= self.fail_max:
+                    if self.opened_at is None:
+                        logger.warning(f"{self.name} circuit opened after {self.failures} failures")
+                    self.opened_at = time.monotonic()
+            elif self.opened_at is not None:
+                # The upstream answered, just not with success (e.g. a 4xx):
+                # the trial shows it is reachable again
+                self._close()
+            raise
+
+        self._close()
+        return result
+
+    def _close(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"{self.name} circuit closed")
+        self.failures = 0
+        self.opened_at = None
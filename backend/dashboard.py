@@ -8,12 +8,19 @@ Supports both mock data preview and live analysis.
 """
 
 import streamlit as st
+import hashlib
 import httpx
+import io
 import json
+import orjson
 import time
+from functools import lru_cache
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 from mock_data import SAMPLE_INPUTS
 
 # ── Page config ─────────────────────────────────────────
@@ -26,9 +33,31 @@ st.set_page_config(
 
 API_BASE = "http://127.0.0.1:8000"
 TIMEOUT = 600  # 10 min for long analyses
+PROGRESS_MIN_INTERVAL = 0.15  # seconds between progress widget redraws
+
+# Engine status stage → (progress fraction, label)
+STAGE_MAP: dict[str, tuple[float, str]] = {
+    "generating_queries": (0.05, "🧠 Generating search queries..."),
+    "searching": (0.20, "🔍 Searching Reddit..."),
+    "analyzing": (0.40, "🤖 Analyzing threads with GPT-4o..."),
+    "evaluation": (0.60, "📊 Evaluating signal coverage..."),
+    "refining_queries": (0.65, "🔄 Refining queries for gaps..."),
+    "synthesizing": (0.85, "📝 Writing final report..."),
+    "complete": (1.0, "✅ Analysis complete!"),
+}
+
+# Threads tab "Sort By" option → thread field
+SORT_COLUMNS = {
+    "Relevance": "relevance_score",
+    "Reddit Score": "score",
+    "Comments": "num_comments",
+}
 
 # ── Custom CSS ──────────────────────────────────────────
-st.markdown("""
+# Re-emitted on every rerun: Streamlit removes any element a rerun does not
+# produce, so gating this on session state would strip the styles after the
+# first interaction.
+_CSS = """
 <style>
     /* Global */
     .stApp { background-color: #0e1117; }
@@ -109,10 +138,12 @@ st.markdown("""
     button[data-baseweb="tab"] { color: #8b949e !important; font-weight: 600 !important; }
     button[data-baseweb="tab"][aria-selected="true"] { color: #58a6ff !important; }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CSS, unsafe_allow_html=True)
 
 
 # ── Helper functions ────────────────────────────────────
+@lru_cache(maxsize=16)
 def signal_badge(signal_type: str) -> str:
     colors = {
         "pain_point": "pain",
@@ -125,6 +156,17 @@ def signal_badge(signal_type: str) -> str:
     return f'<span class="badge badge-{cls}">{label}</span>'
 
 
+@lru_cache(maxsize=8)
+def relevance_bucket_color(bucket: int) -> str:
+    """Card colour for a relevance score bucket (score // 20)."""
+    if bucket >= 4:
+        return "#3fb950"
+    if bucket == 3:
+        return "#d29922"
+    return "#8b949e"
+
+
+@st.cache_data(show_spinner=False)
 def score_gauge(value: int, title: str, color: str) -> go.Figure:
     """Create a radial gauge chart for a score."""
     fig = go.Figure(go.Indicator(
@@ -155,6 +197,7 @@ def score_gauge(value: int, title: str, color: str) -> go.Figure:
     return fig
 
 
+@st.cache_data(show_spinner=False)
 def coverage_chart(coverage: dict) -> go.Figure:
     """Create a radar chart for signal coverage."""
     counts = coverage.get("counts", {})
@@ -191,22 +234,23 @@ def coverage_chart(coverage: dict) -> go.Figure:
     return fig
 
 
-def subreddit_chart(threads: list[dict]) -> go.Figure:
+# Scalar columns relevance_scatter plots or shows on hover
+SCATTER_COLUMNS = ["score", "relevance_score", "num_comments", "signal_type", "title", "subreddit"]
+
+
+@st.cache_data(show_spinner=False)
+def subreddit_chart(subreddits: pd.Series) -> go.Figure:
     """Bar chart of threads by subreddit."""
-    subs = {}
-    for t in threads:
-        sub = t.get("subreddit", "unknown")
-        subs[sub] = subs.get(sub, 0) + 1
-    subs_sorted = sorted(subs.items(), key=lambda x: x[1], reverse=True)[:15]
+    vc = subreddits.fillna("unknown").value_counts().head(15)
 
     fig = go.Figure(go.Bar(
-        x=[s[1] for s in subs_sorted],
-        y=[s[0] for s in subs_sorted],
+        x=vc.values,
+        y=vc.index,
         orientation="h",
         marker=dict(color="#58a6ff", line=dict(width=0)),
     ))
     fig.update_layout(
-        height=max(250, len(subs_sorted) * 30 + 60),
+        height=max(250, len(vc) * 30 + 60),
         margin=dict(l=10, r=10, t=10, b=10),
         paper_bgcolor="rgba(0,0,0,0)",
         plot_bgcolor="rgba(0,0,0,0)",
@@ -217,12 +261,10 @@ def subreddit_chart(threads: list[dict]) -> go.Figure:
     return fig
 
 
-def signal_distribution_chart(threads: list[dict]) -> go.Figure:
+@st.cache_data(show_spinner=False)
+def signal_distribution_chart(signal_types: pd.Series) -> go.Figure:
     """Donut chart of signal types."""
-    types = {}
-    for t in threads:
-        st = t.get("signal_type", "other")
-        types[st] = types.get(st, 0) + 1
+    types = signal_types.fillna("other").value_counts()
 
     colors_map = {
         "pain_point": "#f85149",
@@ -231,9 +273,9 @@ def signal_distribution_chart(threads: list[dict]) -> go.Figure:
         "skepticism": "#58a6ff",
     }
 
-    labels = [k.replace("_", " ").title() for k in types.keys()]
-    values = list(types.values())
-    colors = [colors_map.get(k, "#8b949e") for k in types.keys()]
+    labels = [k.replace("_", " ").title() for k in types.index]
+    values = types.values
+    colors = [colors_map.get(k, "#8b949e") for k in types.index]
 
     fig = go.Figure(go.Pie(
         labels=labels,
@@ -254,8 +296,76 @@ def signal_distribution_chart(threads: list[dict]) -> go.Figure:
     return fig
 
 
-def render_thread_card(thread: dict, idx: int):
-    """Render a single thread as a styled card."""
+@st.cache_data(show_spinner=False)
+def relevance_scatter(df: pd.DataFrame) -> go.Figure | None:
+    """Scatter of relevance vs Reddit score, sized by comment count.
+
+    Takes only the SCATTER_COLUMNS of the threads DataFrame: the list columns
+    are unhashable, and Streamlit would pickle the whole frame to key the cache.
+    """
+    if "relevance_score" not in df.columns or "score" not in df.columns:
+        return None
+    fig = px.scatter(
+        df,
+        x="score",
+        y="relevance_score",
+        size="num_comments",
+        color="signal_type",
+        hover_data=["title", "subreddit"],
+        color_discrete_map={
+            "pain_point": "#f85149",
+            "demand": "#3fb950",
+            "competition": "#d29922",
+            "skepticism": "#58a6ff",
+        },
+        labels={"score": "Reddit Score",
+                "relevance_score": "Relevance Score"},
+    )
+    fig.update_layout(
+        height=400,
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        xaxis=dict(gridcolor="#21262d", tickfont={
+                   "color": "#8b949e"}),
+        yaxis=dict(gridcolor="#21262d", tickfont={
+                   "color": "#8b949e"}),
+        legend=dict(font=dict(color="#c9d1d9")),
+        font=dict(color="#f0f6fc"),
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def threads_dataframe(threads: list[dict]) -> pd.DataFrame:
+    """Build the threads DataFrame once per result set."""
+    return pd.DataFrame(threads)
+
+
+@st.cache_data(show_spinner=False)
+def threads_csv(threads: list[dict]) -> bytes:
+    """Serialize threads to CSV bytes for the download button.
+
+    Written with Arrow's CSV writer; list fields (competitors, needs, quotes)
+    are joined with "; ". The table is built from the threads DataFrame so
+    its columns are the union of every row's keys, not just the first row's.
+    Falls back to pandas if the rows don't map onto an Arrow schema.
+    """
+    try:
+        table = pa.Table.from_pandas(threads_dataframe(threads), preserve_index=False)
+        table = pa.table(
+            [pc.binary_join(col, "; ") if pa.types.is_list(col.type) else col
+             for col in table.columns],
+            names=table.column_names,
+        )
+        buf = io.BytesIO()
+        pacsv.write_csv(table, buf)
+        return buf.getvalue()
+    except pa.ArrowException:
+        return threads_dataframe(threads).to_csv(index=False).encode("utf-8")
+
+
+def thread_card_html(thread: dict) -> str:
+    """Build the HTML for a single thread card."""
     title = thread.get("title", "Untitled")
     url = thread.get("url", "")
     subreddit = thread.get("subreddit", "")
@@ -269,8 +379,7 @@ def render_thread_card(thread: dict, idx: int):
     needs = thread.get("unmet_needs", [])
 
     badge = signal_badge(signal_type)
-    relevance_color = "#3fb950" if relevance >= 80 else (
-        "#d29922" if relevance >= 60 else "#8b949e")
+    relevance_color = relevance_bucket_color(int(relevance) // 20)
 
     quotes_html = ""
     for q in quotes[:2]:
@@ -286,7 +395,7 @@ def render_thread_card(thread: dict, idx: int):
         needs_tags = " · ".join(needs[:3])
         needs_html = f'<div style="color:#3fb950;font-size:0.82rem;margin-top:4px;">💡 Gaps: {needs_tags}</div>'
 
-    card_html = f"""
+    return f"""
     <div class="thread-card">
         <div style="display:flex;justify-content:space-between;align-items:center;">
             <div class="thread-title">
@@ -303,18 +412,82 @@ def render_thread_card(thread: dict, idx: int):
         {needs_html}
     </div>
     """
-    st.markdown(card_html, unsafe_allow_html=True)
 
 
+@st.fragment
+def threads_view(threads: list[dict], threads_df: pd.DataFrame):
+    """Threads tab body; runs as a fragment so filter changes only rerun this view."""
+    st.markdown(f'<div class="section-header">🧵 {len(threads)} Signal Threads Found</div>',
+                unsafe_allow_html=True)
+
+    # Filters
+    signal_col = threads_df.get(
+        "signal_type", pd.Series("", index=threads_df.index)).fillna("")
+    fc1, fc2, fc3 = st.columns(3)
+    with fc1:
+        signal_types = sorted(signal_col.unique())
+        filter_type = st.multiselect(
+            "Filter by Signal Type", signal_types, default=signal_types)
+    with fc2:
+        min_relevance = st.slider("Min Relevance Score", 0, 100, 0)
+    with fc3:
+        sort_by = st.selectbox(
+            "Sort By", list(SORT_COLUMNS))
+
+    # Apply filters and sort on the DataFrame, then map back to the thread
+    # dicts (the frame's RangeIndex lines up with `threads`)
+    relevance_col = threads_df.get(
+        "relevance_score", pd.Series(0, index=threads_df.index)).fillna(0)
+    sort_col = threads_df.get(
+        SORT_COLUMNS[sort_by], pd.Series(0, index=threads_df.index)).fillna(0)
+    mask = signal_col.isin(filter_type) & (relevance_col >= min_relevance)
+    order = sort_col[mask].sort_values(ascending=False, kind="stable").index
+    filtered = [threads[i] for i in order]
+
+    st.caption(f"Showing {len(filtered)} of {len(threads)} threads")
+
+    # One markdown element for all cards instead of one per thread
+    if filtered:
+        st.markdown("".join(thread_card_html(t) for t in filtered),
+                    unsafe_allow_html=True)
+
+
+@st.fragment
+def lazy_json(label: str, data, key: str):
+    """Expander whose JSON is only sent to the browser once the user asks for it.
+
+    Collapsed expanders still ship their contents on every rerun, so the
+    payload sits behind a toggle; flipping it reruns just this fragment.
+    """
+    with st.expander(label, expanded=st.session_state.get(key, False)):
+        if st.toggle("Load JSON", key=key):
+            st.json(data)
+
+
+@st.cache_resource
+def http_client() -> httpx.Client:
+    """Shared keep-alive client for every call to the backend."""
+    return httpx.Client(base_url=API_BASE, timeout=TIMEOUT)
+
+
+@st.cache_data(ttl=10, show_spinner=False)
 def check_backend() -> bool:
-    """Check if the FastAPI backend is running."""
+    """Check if the FastAPI backend is running (cached for 10s across reruns)."""
     try:
-        r = httpx.get(f"{API_BASE}/health", timeout=3)
+        r = http_client().get("/health", timeout=3)
         return r.status_code == 200
     except Exception:
         return False
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_mock_result() -> dict:
+    """Fetch the mock analysis once; repeat previews are served from cache."""
+    resp = http_client().get("/mock/analyze", timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+
 # ── Sidebar ─────────────────────────────────────────────
 with st.sidebar:
     st.markdown("## 💀 PreMortem")
@@ -343,6 +516,13 @@ with st.sidebar:
             st.session_state["solution"] = sample["solution"]
             st.session_state["product_specs"] = sample.get("product_specs", "")
 
+    st.markdown("---")
+    force_rerun = st.checkbox(
+        "Force re-run",
+        value=False,
+        help="Ignore the cached result for an identical idea and run the full analysis again.",
+    )
+
     st.markdown("---")
     backend_ok = check_backend()
     if backend_ok:
@@ -398,68 +578,83 @@ if submitted and idea and problem and solution:
         # Load mock data directly
         with st.spinner("Loading mock data..."):
             try:
-                resp = httpx.get(f"{API_BASE}/mock/analyze", timeout=10)
-                if resp.status_code == 200:
-                    st.session_state["result"] = resp.json()
-                else:
-                    st.error(f"Mock endpoint returned {resp.status_code}")
+                st.session_state["result"] = fetch_mock_result()
+            except httpx.HTTPStatusError as e:
+                st.error(f"Mock endpoint returned {e.response.status_code}")
             except Exception as e:
+                check_backend.clear()
                 st.error(f"Could not reach backend: {e}")
 
     elif mode == "🔍 Live Analysis":
+        payload = {
+            "idea": idea,
+            "problem": problem,
+            "solution": solution,
+            "product_specs": product_specs or "",
+        }
+        # Identical submissions reuse the result already computed this session
+        result_key = "result_" + hashlib.blake2b(
+            json.dumps(payload, sort_keys=True).encode(), digest_size=16).hexdigest()
+
         if not backend_ok:
             st.error(
                 "Backend is offline. Start it with `uvicorn main:app --reload --port 8000`")
+        elif result_key in st.session_state and not force_rerun:
+            st.session_state["result"] = st.session_state[result_key]
+            st.info("♻️ Showing the previous result for this idea. Tick **Force re-run** in the sidebar to analyze again.")
         else:
             progress_bar = st.progress(0, text="Starting analysis...")
             status_placeholder = st.empty()
 
             try:
-                payload = {
-                    "idea": idea,
-                    "problem": problem,
-                    "solution": solution,
-                    "product_specs": product_specs or "",
-                }
-
                 # Use streaming endpoint for live status updates
-                with httpx.Client(timeout=TIMEOUT) as client:
-                    with client.stream("POST", f"{API_BASE}/analyze/stream", json=payload) as response:
-                        full_result = None
-                        step = 0
-                        stage_map = {
-                            "generating_queries": (0.05, "🧠 Generating search queries..."),
-                            "searching": (0.20, "🔍 Searching Reddit..."),
-                            "analyzing": (0.40, "🤖 Analyzing threads with GPT-4o..."),
-                            "evaluation": (0.60, "📊 Evaluating signal coverage..."),
-                            "refining_queries": (0.65, "🔄 Refining queries for gaps..."),
-                            "synthesizing": (0.85, "📝 Writing final report..."),
-                            "complete": (1.0, "✅ Analysis complete!"),
-                        }
-
-                        for line in response.iter_lines():
-                            if not line.startswith("data: "):
-                                continue
-                            data = json.loads(line[6:])
-
-                            if data.get("type") == "status":
-                                stage = data.get("stage", "")
-                                detail = data.get("detail", "")
-                                pct, label = stage_map.get(stage, (None, None))
-                                if pct is not None:
-                                    progress_bar.progress(pct, text=label)
-                                status_placeholder.caption(f"⏳ {detail}")
-
-                            elif data.get("type") == "result":
-                                full_result = data.get("data", {})
-
-                            elif data.get("type") == "error":
-                                st.error(
-                                    f"Engine error: {data.get('detail', 'unknown')}")
+                with http_client().stream("POST", "/analyze/stream", json=payload) as response:
+                    full_result = None
+
+                    # Coalesce chatty status events: only redraw the widgets every
+                    # PROGRESS_MIN_INTERVAL, but always keep the latest state.
+                    last_render = 0.0
+                    latest_progress = None
+                    latest_detail = None
+                    dirty = False
+
+                    for line in response.iter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        data = orjson.loads(line[6:])
+
+                        if data.get("type") == "status":
+                            stage = data.get("stage", "")
+                            latest_detail = data.get("detail", "")
+                            pct, label = STAGE_MAP.get(stage, (None, None))
+                            if pct is not None:
+                                latest_progress = (pct, label)
+                            dirty = True
+
+                            now = time.monotonic()
+                            if stage == "complete" or now - last_render >= PROGRESS_MIN_INTERVAL:
+                                if latest_progress is not None:
+                                    progress_bar.progress(
+                                        latest_progress[0], text=latest_progress[1])
+                                status_placeholder.caption(f"⏳ {latest_detail}")
+                                last_render = now
+                                dirty = False
+
+                        elif data.get("type") == "result":
+                            full_result = data.get("data", {})
+
+                        elif data.get("type") == "error":
+                            st.error(
+                                f"Engine error: {data.get('detail', 'unknown')}")
+
+                    if dirty:
+                        if latest_progress is not None:
+                            progress_bar.progress(
+                                latest_progress[0], text=latest_progress[1])
+                        status_placeholder.caption(f"⏳ {latest_detail}")
 
                 if full_result:
                     # Convert to the same shape as the /analyze JSON response
-                    from models import SignalThread, Scores
                     threads = full_result.get("threads", [])
                     scores_raw = full_result.get("scores", {})
                     st.session_state["result"] = {
@@ -471,6 +666,7 @@ if submitted and idea and problem and solution:
                         "coverage": full_result.get("coverage", {}),
                         "elapsed_seconds": full_result.get("elapsed_seconds", 0),
                     }
+                    st.session_state[result_key] = st.session_state["result"]
                     progress_bar.progress(1.0, text="✅ Done!")
                     status_placeholder.empty()
 
@@ -478,6 +674,7 @@ if submitted and idea and problem and solution:
                 st.error(
                     "Analysis timed out (>10 min). The idea may be too broad — try being more specific.")
             except Exception as e:
+                check_backend.clear()
                 st.error(f"Error: {e}")
 
 elif submitted:
@@ -493,6 +690,7 @@ if "result" in st.session_state and st.session_state["result"]:
     iterations = result.get("iterations", 0)
     elapsed = result.get("elapsed_seconds", 0)
     queries_used = result.get("queries_used", [])
+    threads_df = threads_dataframe(threads)
 
     st.markdown("---")
 
@@ -540,42 +738,7 @@ if "result" in st.session_state and st.session_state["result"]:
 
     # ── TAB: Signal Threads ─────────────────────────────
     with tab_threads:
-        st.markdown(f'<div class="section-header">🧵 {len(threads)} Signal Threads Found</div>',
-                    unsafe_allow_html=True)
-
-        # Filters
-        fc1, fc2, fc3 = st.columns(3)
-        with fc1:
-            signal_types = sorted(set(t.get("signal_type", "")
-                                  for t in threads))
-            filter_type = st.multiselect(
-                "Filter by Signal Type", signal_types, default=signal_types)
-        with fc2:
-            min_relevance = st.slider("Min Relevance Score", 0, 100, 0)
-        with fc3:
-            sort_by = st.selectbox(
-                "Sort By", ["Relevance", "Reddit Score", "Comments"])
-
-        # Apply filters
-        filtered = [
-            t for t in threads
-            if t.get("signal_type", "") in filter_type
-            and t.get("relevance_score", 0) >= min_relevance
-        ]
-
-        # Sort
-        if sort_by == "Relevance":
-            filtered.sort(key=lambda t: t.get(
-                "relevance_score", 0), reverse=True)
-        elif sort_by == "Reddit Score":
-            filtered.sort(key=lambda t: t.get("score", 0), reverse=True)
-        elif sort_by == "Comments":
-            filtered.sort(key=lambda t: t.get("num_comments", 0), reverse=True)
-
-        st.caption(f"Showing {len(filtered)} of {len(threads)} threads")
-
-        for i, thread in enumerate(filtered):
-            render_thread_card(thread, i)
+        threads_view(threads, threads_df)
 
     # ── TAB: Charts ─────────────────────────────────────
     with tab_charts:
@@ -588,45 +751,20 @@ if "result" in st.session_state and st.session_state["result"]:
             st.markdown(
                 '<div class="section-header">🧩 Signal Distribution</div>', unsafe_allow_html=True)
             st.plotly_chart(signal_distribution_chart(
-                threads), use_container_width=True)
+                threads_df.get("signal_type", pd.Series(dtype=object))), use_container_width=True)
 
         st.markdown(
             '<div class="section-header">🏘️ Subreddit Distribution</div>', unsafe_allow_html=True)
-        st.plotly_chart(subreddit_chart(threads), use_container_width=True)
+        st.plotly_chart(subreddit_chart(
+            threads_df.get("subreddit", pd.Series(dtype=object))), use_container_width=True)
 
         # Relevance heatmap
         if threads:
             st.markdown(
                 '<div class="section-header">🎯 Relevance vs Reddit Score</div>', unsafe_allow_html=True)
-            df = pd.DataFrame(threads)
-            if "relevance_score" in df.columns and "score" in df.columns:
-                fig = px.scatter(
-                    df,
-                    x="score",
-                    y="relevance_score",
-                    size="num_comments",
-                    color="signal_type",
-                    hover_data=["title", "subreddit"],
-                    color_discrete_map={
-                        "pain_point": "#f85149",
-                        "demand": "#3fb950",
-                        "competition": "#d29922",
-                        "skepticism": "#58a6ff",
-                    },
-                    labels={"score": "Reddit Score",
-                            "relevance_score": "Relevance Score"},
-                )
-                fig.update_layout(
-                    height=400,
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    xaxis=dict(gridcolor="#21262d", tickfont={
-                               "color": "#8b949e"}),
-                    yaxis=dict(gridcolor="#21262d", tickfont={
-                               "color": "#8b949e"}),
-                    legend=dict(font=dict(color="#c9d1d9")),
-                    font=dict(color="#f0f6fc"),
-                )
+            fig = relevance_scatter(
+                threads_df[[c for c in SCATTER_COLUMNS if c in threads_df.columns]])
+            if fig is not None:
                 st.plotly_chart(fig, use_container_width=True)
 
         # Competitors table
@@ -667,24 +805,15 @@ if "result" in st.session_state and st.session_state["result"]:
 
         # Export as CSV
         if threads:
-            df = pd.DataFrame(threads)
-            csv = df.to_csv(index=False)
             st.download_button(
                 "📥 Download Threads as CSV",
-                csv,
+                threads_csv(threads),
                 file_name="premortem_threads.csv",
                 mime="text/csv",
                 use_container_width=True,
             )
 
-        with st.expander("Full JSON Response", expanded=False):
-            st.json(result)
-
-        with st.expander("Scores", expanded=False):
-            st.json(scores)
-
-        with st.expander("Coverage", expanded=False):
-            st.json(coverage)
-
-        with st.expander(f"All Threads ({len(threads)})", expanded=False):
-            st.json(threads)
+        lazy_json("Full JSON Response", result, key="raw_json_full")
+        lazy_json("Scores", scores, key="raw_json_scores")
+        lazy_json("Coverage", coverage, key="raw_json_coverage")
+        lazy_json(f"All Threads ({len(threads)})", threads, key="raw_json_threads")
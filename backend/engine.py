@@ -14,14 +14,22 @@ The loop runs up to MAX_ITERATIONS times (default 3).
 """
 
 import asyncio
-import json
 import logging
+import re
 import time
-from typing import Any
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Awaitable, Callable
 
+import orjson
 from openai import AsyncOpenAI
+from pydantic import TypeAdapter, ValidationError
+
+import llm_cache
+from models import SearchQuery, SynthesisResult, ThreadAnalysis
 
 from prompts import (
+    STARTUP_CONTEXT,
     QUERY_GENERATION_SYSTEM,
     QUERY_GENERATION_USER,
     ANALYSIS_SYSTEM,
@@ -40,8 +48,43 @@ MAX_ITERATIONS = 2          # max feedback-loop cycles
 INITIAL_QUERIES = 4         # queries generated in round 1
 REFINEMENT_QUERIES = 3      # queries generated per refinement round
 MIN_SIGNALS_PER_TYPE = 2    # minimum threads needed per signal type before we stop
+SEARCH_CONCURRENCY = 8      # max queries searched/enriched at once
+OPENAI_CONCURRENCY = 8      # max in-flight OpenAI requests (TPM/RPM guard)
 MODEL = "gpt-4o"            # model to use
 TEMPERATURE = 0.4           # low temp for structured output
+STREAM_PROGRESS_EVERY = 50  # streamed chunks between on_progress callbacks
+SELFTEXT_MAX_TOKENS = 200   # per-thread body budget in the analysis prompt
+COMMENT_MAX_TOKENS = 60     # per-comment budget in the analysis prompt
+ANALYSIS_BATCH_THREADS = 20 # max threads packed into one analysis call
+
+# Created on first use so it binds to the running event loop, not import time
+_OPENAI_SEM: asyncio.Semaphore | None = None
+
+
+def _openai_sem() -> asyncio.Semaphore:
+    global _OPENAI_SEM
+    if _OPENAI_SEM is None:
+        _OPENAI_SEM = asyncio.Semaphore(OPENAI_CONCURRENCY)
+    return _OPENAI_SEM
+
+# Leading ```json / trailing ``` fence the model sometimes adds, on its own
+# line or on the same line as the JSON
+_FENCE_RE = re.compile(r"\A```(?i:json)?\s*|\s*```\Z")
+
+# Per-stage output validators (built once; pydantic-core compiles the schema)
+_QUERIES_ADAPTER = TypeAdapter(list[SearchQuery])
+# Analysis output is checked for shape as a whole, then item by item, so one
+# malformed verdict doesn't throw away the rest of the batch
+_ANALYSIS_ADAPTER = TypeAdapter(list[dict])
+_THREAD_ANALYSIS_ADAPTER = TypeAdapter(ThreadAnalysis)
+_SYNTHESIS_ADAPTER = TypeAdapter(SynthesisResult)
+
+RETRY_SUFFIX = """
+
+Your previous reply did not match the required JSON schema:
+{error}
+Return ONLY corrected JSON in the exact format requested above.
+"""
 
 
 async def call_openai(
@@ -49,41 +92,141 @@ async def call_openai(
     system: str,
     user: str,
     temperature: float = TEMPERATURE,
+    context: str = "",
+    on_progress: Callable[[int], Awaitable[None]] | None = None,
 ) -> str:
-    """Call OpenAI ChatCompletion and return the assistant message content."""
-    response = await client.chat.completions.create(
-        model=MODEL,
-        temperature=temperature,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        response_format={"type": "json_object"},
-    )
-    return response.choices[0].message.content
+    """
+    Call OpenAI ChatCompletion and return the assistant message content.
+    `context` is appended to the system message so the static part of the
+    prompt forms a stable, cacheable prefix.
+    If `on_progress` is given, the response is streamed and
+    on_progress(chars_received) is awaited every STREAM_PROGRESS_EVERY chunks.
+    Responses are served from llm_cache when PRUNE_LLM_CACHE is set.
+    """
+    if context:
+        system = f"{system}\n{context}"
+    if not llm_cache.enabled():
+        return await _complete(client, system, user, temperature, on_progress)
+
+    cache_key = llm_cache.make_key(MODEL, temperature, system, user)
+    cached = await asyncio.to_thread(llm_cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    content = await _complete(client, system, user, temperature, on_progress)
+    await asyncio.to_thread(llm_cache.set, cache_key, content)
+    return content
+
+
+async def _complete(
+    client: AsyncOpenAI,
+    system: str,
+    user: str,
+    temperature: float,
+    on_progress: Callable[[int], Awaitable[None]] | None,
+) -> str:
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+    async with _openai_sem():
+        if on_progress is None:
+            response = await client.chat.completions.create(
+                model=MODEL,
+                temperature=temperature,
+                messages=messages,
+                response_format={"type": "json_object"},
+            )
+            return response.choices[0].message.content
+
+        stream = await client.chat.completions.create(
+            model=MODEL,
+            temperature=temperature,
+            messages=messages,
+            response_format={"type": "json_object"},
+            stream=True,
+        )
+        parts: list[str] = []
+        received = 0
+        n_chunks = 0
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                received += len(delta)
+            n_chunks += 1
+            if n_chunks % STREAM_PROGRESS_EVERY == 0:
+                await on_progress(received)
+    return "".join(parts)
+
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    """tiktoken encoding for MODEL, or None if tiktoken is unavailable."""
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model(MODEL)
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, truncating by characters: {e}")
+        return None
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` to at most `max_tokens` model tokens (~4 chars/token without tiktoken)."""
+    enc = _token_encoding()
+    if enc is None:
+        return text[:max_tokens * 4]
+    tokens = enc.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
 
 
 async def safe_parse_json(raw: str) -> Any:
     """Parse JSON from ChatGPT, handling common quirks."""
-    raw = raw.strip()
     # Sometimes the model wraps in ```json ... ```
-    if raw.startswith("```"):
-        raw = raw.split("\n", 1)[-1]
-        if raw.endswith("```"):
-            raw = raw[:-3]
+    raw = _FENCE_RE.sub("", raw.strip())
     try:
-        parsed = json.loads(raw)
+        parsed = orjson.loads(raw)
         # If the model returned {"queries": [...]}, unwrap
         if isinstance(parsed, dict):
             for key in ("queries", "results", "threads", "signals", "data"):
                 if key in parsed and isinstance(parsed[key], list):
                     return parsed[key]
         return parsed
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"JSON parse error: {e}\nRaw: {raw[:500]}")
         return []
 
 
+async def call_validated(
+    client: AsyncOpenAI,
+    system: str,
+    user: str,
+    adapter: TypeAdapter,
+    **kwargs,
+) -> Any:
+    """
+    call_openai + safe_parse_json + schema validation.
+    On a validation failure the call is retried once with the error appended
+    to the user message (the system prefix stays identical, so the retry
+    still hits the prompt cache). Returns None if both attempts fail.
+    """
+    prompt = user
+    for attempt in range(2):
+        raw = await call_openai(client, system, prompt, **kwargs)
+        parsed = await safe_parse_json(raw)
+        try:
+            return adapter.validate_python(parsed)
+        except ValidationError as e:
+            logger.warning(f"Model output failed validation (attempt {attempt + 1}): {e}")
+            prompt = user + RETRY_SUFFIX.format(error=e)
+    return None
+
+
 # ─────────────────────────────────────────────────────────
 # Stage 1: Generate Search Queries
 # ─────────────────────────────────────────────────────────
@@ -103,23 +246,28 @@ async def generate_queries(
         product_specs=product_specs,
         num_queries=num_queries,
     )
-    raw = await call_openai(client, QUERY_GENERATION_SYSTEM, user_prompt)
-    queries = await safe_parse_json(raw)
+    queries = await call_validated(
+        client, QUERY_GENERATION_SYSTEM, user_prompt, _QUERIES_ADAPTER)
 
-    if not isinstance(queries, list):
-        logger.error(f"Expected list of queries, got: {type(queries)}")
+    if queries is None:
+        logger.error("Query generation returned no valid queries")
         return []
 
     logger.info(f"Generated {len(queries)} search queries")
-    return queries
+    return [q.model_dump() for q in queries]
 
 
 # ─────────────────────────────────────────────────────────
 # Stage 2: Search Reddit
 # ─────────────────────────────────────────────────────────
-async def search_all_queries(queries: list[dict]) -> dict[str, list[dict]]:
+async def search_all_queries(
+    queries: list[dict],
+    max_concurrency: int = SEARCH_CONCURRENCY,
+) -> dict[str, list[dict]]:
     """
     Run all search queries against Reddit concurrently.
+    At most `max_concurrency` queries are in flight at once; individual HTTP
+    calls are additionally gated by the reddit_client semaphore.
     Returns a dict mapping query_string -> list of threads.
     """
     async def _search_and_enrich(q: dict) -> tuple[str, list[dict]]:
@@ -146,7 +294,13 @@ async def search_all_queries(queries: list[dict]) -> dict[str, list[dict]]:
         logger.info(f"Query '{query_str}' → {len(enriched)} threads")
         return query_str, enriched
 
-    pairs = await asyncio.gather(*[_search_and_enrich(q) for q in queries])
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _bounded(q: dict) -> tuple[str, list[dict]]:
+        async with sem:
+            return await _search_and_enrich(q)
+
+    pairs = await asyncio.gather(*[_bounded(q) for q in queries])
     return dict(pairs)
 
 
@@ -155,54 +309,70 @@ async def search_all_queries(queries: list[dict]) -> dict[str, list[dict]]:
 # ─────────────────────────────────────────────────────────
 async def analyze_threads(
     client: AsyncOpenAI,
-    idea: str,
-    problem: str,
-    solution: str,
-    product_specs: str,
-    query: str,
-    intent: str,
-    threads: list[dict],
+    context: str,
+    batches: list[tuple[str, str, list[dict]]],
 ) -> list[dict]:
-    """Use ChatGPT to score and classify each thread's relevance."""
-    if not threads:
+    """
+    Use ChatGPT to score and classify each thread's relevance.
+    `batches` is a list of (query, intent, threads) tuples; all of them are
+    analyzed in a single call so several small queries share one request.
+    """
+    batches_for_prompt = []
+    thread_map: dict[str, tuple[dict, str]] = {}  # thread_id -> (thread, query)
+    seen_titles: set[str] = set()
+    for query, intent, threads in batches:
+        # Prepare a concise representation of threads for the prompt
+        threads_for_prompt = []
+        for t in threads:
+            # Cross-posts and reposts share a title — only pay for one of them
+            title_key = t["title"].lower().strip()
+            if title_key in seen_titles:
+                continue
+            seen_titles.add(title_key)
+            thread_map[t["id"]] = (t, query)
+            threads_for_prompt.append({
+                "id": t["id"],
+                "title": t["title"],
+                "selftext": _truncate_tokens(t["selftext"], SELFTEXT_MAX_TOKENS),
+                "subreddit": t["subreddit"],
+                "score": t["score"],
+                "num_comments": t["num_comments"],
+                "top_comments": [
+                    _truncate_tokens(c, COMMENT_MAX_TOKENS)
+                    for c in t.get("top_comments", [])[:3]
+                ],
+            })
+        if threads_for_prompt:
+            batches_for_prompt.append(
+                {"query": query, "intent": intent, "threads": threads_for_prompt})
+
+    queries_label = ", ".join(f"'{q}'" for q, _, _ in batches)
+    if not batches_for_prompt:
         return []
 
-    # Prepare a concise representation of threads for the prompt
-    threads_for_prompt = []
-    for t in threads:
-        threads_for_prompt.append({
-            "id": t["id"],
-            "title": t["title"],
-            "selftext": t["selftext"][:800],
-            "subreddit": t["subreddit"],
-            "score": t["score"],
-            "num_comments": t["num_comments"],
-            "top_comments": t.get("top_comments", [])[:3],
-        })
-
     user_prompt = ANALYSIS_USER.format(
-        idea=idea,
-        problem=problem,
-        solution=solution,
-        product_specs=product_specs,
-        query=query,
-        intent=intent,
-        threads_json=json.dumps(threads_for_prompt, indent=2),
+        batches_json=orjson.dumps(batches_for_prompt).decode(),
     )
-    raw = await call_openai(client, ANALYSIS_SYSTEM, user_prompt)
-    analyzed = await safe_parse_json(raw)
+    analyzed = await call_validated(
+        client, ANALYSIS_SYSTEM, user_prompt, _ANALYSIS_ADAPTER, context=context)
 
-    if not isinstance(analyzed, list):
-        logger.error(
-            f"Expected list of analyzed threads, got: {type(analyzed)}")
+    if analyzed is None:
+        logger.error(f"Analysis for {queries_label} returned no valid output")
         return []
 
     # Merge analysis back with original thread data
-    thread_map = {t["id"]: t for t in threads}
     enriched = []
-    for a in analyzed:
-        tid = a.get("thread_id", "")
-        original = thread_map.get(tid, {})
+    for item in analyzed:
+        try:
+            a = _THREAD_ANALYSIS_ADAPTER.validate_python(item).model_dump()
+        except ValidationError as e:
+            logger.warning(f"Dropping invalid thread analysis: {e}")
+            continue
+        tid = a["thread_id"]
+        # Drop hallucinated ids and repeated entries for the same thread
+        original, query = thread_map.pop(tid, (None, ""))
+        if original is None:
+            continue
         enriched.append({
             **a,
             "title": original.get("title", ""),
@@ -213,32 +383,65 @@ async def analyze_threads(
             "source_query": query,
         })
 
-    logger.info(f"Analyzed {len(enriched)} threads for query '{query}'")
+    logger.info(f"Analyzed {len(enriched)} threads for {queries_label}")
     return enriched
 
 
+def group_for_analysis(
+    queries: list[dict],
+    search_results: dict[str, list[dict]],
+    max_threads: int = ANALYSIS_BATCH_THREADS,
+) -> list[list[tuple[str, str, list[dict]]]]:
+    """
+    Pack queries into analysis groups of at most `max_threads` threads each,
+    so several small queries share one LLM call. A query larger than the cap
+    gets a group of its own. Queries with no threads are skipped.
+    """
+    groups: list[list[tuple[str, str, list[dict]]]] = []
+    current: list[tuple[str, str, list[dict]]] = []
+    size = 0
+    for q in queries:
+        query_str = q.get("query", "")
+        threads = search_results.get(query_str, [])
+        if not threads:
+            continue
+        if current and size + len(threads) > max_threads:
+            groups.append(current)
+            current, size = [], 0
+        current.append((query_str, q.get("intent", "demand"), threads))
+        size += len(threads)
+    if current:
+        groups.append(current)
+    return groups
+
+
 # ─────────────────────────────────────────────────────────
 # Stage 4: Evaluate Signal Coverage
 # ─────────────────────────────────────────────────────────
-def evaluate_coverage(all_signals: list[dict]) -> dict:
+def evaluate_coverage(all_signals: list[dict], prior: dict | None = None) -> dict:
     """
     Count signals by type and identify gaps.
+    If `prior` (an earlier coverage report) is given, only `all_signals` —
+    the signals added since that report — are folded into its counts.
     Returns a coverage report.
     """
-    counts = {
-        "pain_point": 0,
-        "competition": 0,
-        "demand": 0,
-        "skepticism": 0,
-    }
-    competitors = set()
+    if prior is None:
+        counts = {
+            "pain_point": 0,
+            "competition": 0,
+            "demand": 0,
+            "skepticism": 0,
+        }
+        competitors = set()
+    else:
+        counts = dict(prior["counts"])
+        competitors = set(prior["competitors"])
 
     for s in all_signals:
         st = s.get("signal_type", "irrelevant")
         if st in counts:
             counts[st] += 1
-        for prod in s.get("competing_products", []):
-            competitors.add(prod)
+        competitors.update(s.get("competing_products", ()))
 
     gaps = []
     for signal_type, count in counts.items():
@@ -261,19 +464,12 @@ def evaluate_coverage(all_signals: list[dict]) -> dict:
 # ─────────────────────────────────────────────────────────
 async def refine_queries(
     client: AsyncOpenAI,
-    idea: str,
-    problem: str,
-    solution: str,
-    product_specs: str,
+    context: str,
     coverage: dict,
     total_threads: int,
 ) -> list[dict]:
     """Use ChatGPT to generate refined queries based on coverage gaps."""
     user_prompt = REFINEMENT_USER.format(
-        idea=idea,
-        problem=problem,
-        solution=solution,
-        product_specs=product_specs,
         total_threads=total_threads,
         pain_count=coverage["counts"]["pain_point"],
         comp_count=coverage["counts"]["competition"],
@@ -284,14 +480,14 @@ async def refine_queries(
         gaps="; ".join(coverage["gaps"]) or "None",
         num_queries=REFINEMENT_QUERIES,
     )
-    raw = await call_openai(client, REFINEMENT_SYSTEM, user_prompt)
-    queries = await safe_parse_json(raw)
+    queries = await call_validated(
+        client, REFINEMENT_SYSTEM, user_prompt, _QUERIES_ADAPTER, context=context)
 
-    if not isinstance(queries, list):
+    if queries is None:
         return []
 
     logger.info(f"Refinement generated {len(queries)} new queries")
-    return queries
+    return [q.model_dump() for q in queries]
 
 
 # ─────────────────────────────────────────────────────────
@@ -299,33 +495,29 @@ async def refine_queries(
 # ─────────────────────────────────────────────────────────
 async def synthesize_report(
     client: AsyncOpenAI,
-    idea: str,
-    problem: str,
-    solution: str,
-    product_specs: str,
+    context: str,
     all_signals: list[dict],
+    on_progress: Callable[[int], Awaitable[None]] | None = None,
 ) -> dict:
-    """Use ChatGPT to write the final market signal report."""
+    """
+    Use ChatGPT to write the final market signal report.
+    `all_signals` must already be sorted by relevance_score, highest first.
+    `on_progress` is forwarded to call_openai to stream the (long) response.
+    """
     # Only include the most relevant signals for the synthesis prompt
-    top_signals = sorted(
-        all_signals,
-        key=lambda s: s.get("relevance_score", 0),
-        reverse=True,
-    )[:30]  # cap to avoid token overflow
+    top_signals = all_signals[:30]  # cap to avoid token overflow
 
     user_prompt = SYNTHESIS_USER.format(
-        idea=idea,
-        problem=problem,
-        solution=solution,
-        product_specs=product_specs,
-        all_signals_json=json.dumps(top_signals, indent=2),
+        all_signals_json=orjson.dumps(top_signals).decode(),
+    )
+    result = await call_validated(
+        client, SYNTHESIS_SYSTEM, user_prompt, _SYNTHESIS_ADAPTER,
+        temperature=0.5, context=context, on_progress=on_progress,
     )
-    raw = await call_openai(client, SYNTHESIS_SYSTEM, user_prompt, temperature=0.5)
-    parsed = await safe_parse_json(raw)
 
-    if isinstance(parsed, dict):
-        return parsed
-    return {"report": str(parsed), "scores": {}}
+    if result is None:
+        return {"report": "", "scores": {}}
+    return result.model_dump()
 
 
 # ─────────────────────────────────────────────────────────
@@ -354,9 +546,16 @@ async def run_reddit_signal_engine(
       - coverage: dict
     """
     client = AsyncOpenAI(api_key=openai_api_key)
+    # Invariant across every call in this run — computed once so the cached
+    # prompt prefix stays byte-identical.
+    context = STARTUP_CONTEXT.format(
+        idea=idea, problem=problem, solution=solution, product_specs=product_specs
+    )
     all_signals: list[dict] = []
     all_queries_used: list[str] = []
+    seen_thread_ids: set[str] = set()
     iteration = 0
+    coverage = evaluate_coverage([])
     start_time = time.time()
 
     async def status(stage: str, detail: str):
@@ -377,13 +576,11 @@ async def run_reddit_signal_engine(
             )
         else:
             await status("refining_queries", f"Refining queries (iteration {iteration})...")
-            coverage = evaluate_coverage(all_signals)
             if not coverage["has_gaps"]:
                 await status("coverage_complete", "All signal types have sufficient coverage!")
                 break
             queries = await refine_queries(
-                client, idea, problem, solution, product_specs,
-                coverage, len(all_signals),
+                client, context, coverage, len(all_signals),
             )
 
         if not queries:
@@ -394,26 +591,47 @@ async def run_reddit_signal_engine(
         await status("searching", f"Searching Reddit with {len(queries)} queries...")
         search_results = await search_all_queries(queries)
 
-        # Step 3: Analyze all query batches concurrently
-        async def _analyze_one(q: dict) -> list[dict]:
+        # Drop threads already returned by an earlier query so each thread is
+        # sent to the model at most once per run
+        raw_count = sum(len(v) for v in search_results.values())
+        for q in queries:
             query_str = q.get("query", "")
-            threads = search_results.get(query_str, [])
-            if not threads:
-                return []
-            await status("analyzing", f"Analyzing {len(threads)} threads for: '{query_str}'")
-            return await analyze_threads(
-                client, idea, problem, solution, product_specs,
-                query_str, q.get("intent", "demand"), threads,
-            )
+            fresh = [t for t in search_results.get(query_str, []) if t["id"] not in seen_thread_ids]
+            seen_thread_ids.update(t["id"] for t in fresh)
+            search_results[query_str] = fresh
+        logger.info(
+            f"Deduplicated {raw_count} → {sum(len(v) for v in search_results.values())} threads"
+        )
+
+        # Step 3: Analyze — small queries are packed into shared calls,
+        # and the resulting groups run concurrently
+        groups = group_for_analysis(queries, search_results)
+        n_before = len(all_signals)
+
+        async def _analyze_group(group: list[tuple[str, str, list[dict]]]) -> list[dict]:
+            n_threads = sum(len(threads) for _, _, threads in group)
+            labels = ", ".join(f"'{query_str}'" for query_str, _, _ in group)
+            await status("analyzing", f"Analyzing {n_threads} threads for: {labels}")
+            return await analyze_threads(client, context, group)
 
-        analysis_batches = await asyncio.gather(*[_analyze_one(q) for q in queries])
-        for q, analyzed in zip(queries, analysis_batches):
-            if analyzed:
-                all_queries_used.append(q.get("query", ""))
-                all_signals.extend(analyzed)
+        analysis_results = await asyncio.gather(
+            *[_analyze_group(g) for g in groups], return_exceptions=True
+        )
+        productive_queries: set[str] = set()
+        for group, analyzed in zip(groups, analysis_results):
+            # BaseException: a cancelled group comes back as CancelledError
+            if isinstance(analyzed, BaseException):
+                labels = ", ".join(query_str for query_str, _, _ in group)
+                logger.error(f"Analysis failed for {labels}: {analyzed!r}")
+                continue
+            all_signals.extend(analyzed)
+            productive_queries.update(a["source_query"] for a in analyzed)
+        all_queries_used.extend(
+            q.get("query", "") for q in queries if q.get("query", "") in productive_queries
+        )
 
-        # Step 4: Evaluate coverage
-        coverage = evaluate_coverage(all_signals)
+        # Step 4: Evaluate coverage (fold in only this iteration's signals)
+        coverage = evaluate_coverage(all_signals[n_before:], prior=coverage)
         await status(
             "evaluation",
             f"Signals: pain={coverage['counts']['pain_point']}, "
@@ -427,37 +645,28 @@ async def run_reddit_signal_engine(
         if not coverage["has_gaps"]:
             break
 
-    # ── DEDUPLICATE signals by thread_id ──
-    seen_ids = set()
-    unique_signals = []
-    for s in all_signals:
-        tid = s.get("thread_id", "")
-        if tid and tid not in seen_ids:
-            seen_ids.add(tid)
-            unique_signals.append(s)
-    all_signals = unique_signals
+    # Sort once; synthesis and the returned threads both use this order
+    all_signals.sort(key=itemgetter("relevance_score"), reverse=True)
 
     # ── SYNTHESIZE ──
     await status("synthesizing", f"Synthesizing report from {len(all_signals)} signals...")
+
+    async def synthesis_progress(chars: int):
+        await status("synthesizing_progress", f"Writing report... {chars:,} characters so far")
+
     report_data = await synthesize_report(
-        client, idea, problem, solution, product_specs, all_signals
+        client, context, all_signals, on_progress=synthesis_progress
     )
 
     elapsed = round(time.time() - start_time, 1)
     await status("complete", f"Done in {elapsed}s — {iteration} iterations, {len(all_signals)} signals")
 
-    final_coverage = evaluate_coverage(all_signals)
-
     return {
         "report": report_data.get("report", ""),
         "scores": report_data.get("scores", {}),
-        "threads": sorted(
-            all_signals,
-            key=lambda s: s.get("relevance_score", 0),
-            reverse=True,
-        ),
+        "threads": all_signals,
         "iterations": iteration,
         "queries_used": all_queries_used,
-        "coverage": final_coverage,
+        "coverage": coverage,
         "elapsed_seconds": elapsed,
     }
@@ -6,66 +6,249 @@ Handles keyword extraction, GitHub repo search, competition risk scoring,
 and relevance ranking.
 """
 
-import json
+import asyncio
 import logging
 import os
+import random
 import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
 from typing import List
 
-import requests
+import httpx
+import orjson
 from fastapi import HTTPException
 
+import keyword_cache
+
 logger = logging.getLogger(__name__)
 
 GITHUB_API_URL = "https://api.github.com/search/repositories"
 
+GEMINI_KEYWORD_MODEL = "gemini-1.5-flash"
+# Bump when the keyword prompt changes so stale cache entries are ignored
+KEYWORD_PROMPT_VERSION = "v1"
+
+# Gemini sometimes wraps its JSON answer in a ```json fence
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*([\s\S]*?)```')
+
+_PUNCT = ".,!?;:\"'()[]{}"
+_PUNCT_TBL = str.maketrans("", "", _PUNCT)
+
+# Stop words dropped by the no-Gemini keyword fallback
+_EXTRACT_STOP_WORDS = frozenset(
+    {"a", "an", "the", "is", "for", "and", "or", "to", "of", "in", "that", "with"}
+)
+
+# Shared async client so repeated searches reuse pooled connections.
+# Created lazily on first use and closed by the app's lifespan handler.
+# Pooled connections belong to the loop that opened them, so a new loop
+# (e.g. a second asyncio.run) gets a fresh client.
+_GITHUB_CLIENT: httpx.AsyncClient | None = None
+_GITHUB_CLIENT_LOOP: asyncio.AbstractEventLoop | None = None
+_GITHUB_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+
+def _client() -> httpx.AsyncClient:
+    global _GITHUB_CLIENT, _GITHUB_CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if _GITHUB_CLIENT is None or _GITHUB_CLIENT_LOOP is not loop:
+        _GITHUB_CLIENT = httpx.AsyncClient(
+            timeout=10,
+            # Retry failed connects; pool limits live on the transport
+            transport=httpx.AsyncHTTPTransport(retries=2, limits=_GITHUB_LIMITS),
+        )
+        _GITHUB_CLIENT_LOOP = loop
+    return _GITHUB_CLIENT
+
+
+async def close_github_client() -> None:
+    """Close the shared GitHub client (called on app shutdown)."""
+    global _GITHUB_CLIENT, _GITHUB_CLIENT_LOOP
+    if _GITHUB_CLIENT is not None and _GITHUB_CLIENT_LOOP is asyncio.get_running_loop():
+        await _GITHUB_CLIENT.aclose()
+    _GITHUB_CLIENT = None
+    _GITHUB_CLIENT_LOOP = None
+
+
+# Caps on in-flight upstream calls across all requests; a traffic spike queues
+# here instead of tripping GitHub's secondary rate limits or Gemini's quota
+GITHUB_CONCURRENCY = 10
+GEMINI_CONCURRENCY = 4
+# One semaphore per event loop, like _client(): a semaphore is bound to the
+# loop it is first contended on, and tests or asyncio.run in a worker thread
+# bring their own loops
+_GITHUB_SEMS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_GEMINI_SEMS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_sem(sems: weakref.WeakKeyDictionary, limit: int) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = sems.get(loop)
+    if sem is None:
+        sem = sems[loop] = asyncio.Semaphore(limit)
+    return sem
+
+
+def _github_sem() -> asyncio.Semaphore:
+    return _loop_sem(_GITHUB_SEMS, GITHUB_CONCURRENCY)
+
+
+def _gemini_sem() -> asyncio.Semaphore:
+    return _loop_sem(_GEMINI_SEMS, GEMINI_CONCURRENCY)
+
+
+# query -> (ETag, parsed result); GitHub answers 304 for unchanged results and
+# does not count conditional hits against the rate limit
+_ETAG_CACHE: "OrderedDict[str, tuple[str, dict]]" = OrderedDict()
+_ETAG_CACHE_MAX = 256
+
+# Rate-limit handling: retry 403/429 up to this many times, but never sleep
+# longer than the cap — beyond that the caller gets the 403 immediately
+_GITHUB_MAX_ATTEMPTS = 3
+_GITHUB_MAX_WAIT_S = 60.0
+
+
+class GitHubRateLimiter:
+    """Tracks X-RateLimit-* headers and holds requests once the quota is spent."""
+
+    def __init__(self) -> None:
+        self.remaining: int | None = None
+        self.reset_at: float = 0.0
+
+    def wait_time(self) -> float:
+        """Seconds until the quota resets, or 0 if requests may go out now."""
+        if self.remaining is None or self.remaining > 0:
+            return 0.0
+        return max(self.reset_at - time.time(), 0.0)
+
+    async def acquire(self) -> None:
+        wait = self.wait_time()
+        if wait > _GITHUB_MAX_WAIT_S:
+            raise HTTPException(status_code=403, detail="GitHub API rate limit exceeded or bad token.")
+        if wait > 0:
+            logger.info(f"GitHub quota exhausted, waiting {wait:.1f}s for reset")
+            await asyncio.sleep(wait)
+
+    def update(self, headers: httpx.Headers) -> None:
+        try:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in headers:
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+        except ValueError:
+            pass
+
+    def retry_after(self, headers: httpx.Headers) -> float:
+        """Delay GitHub asks for on a 403/429 (Retry-After, else time to reset)."""
+        try:
+            return float(headers["Retry-After"])
+        except (KeyError, ValueError):
+            return self.wait_time()
+
+
+_RATE_LIMITER = GitHubRateLimiter()
+
+# Gemini model reused across calls; rebuilt only when the API key changes
+_GEMINI_MODEL = None
+_GEMINI_KEY: str | None = None
+_GEMINI_LOCK = threading.Lock()
+
+
+def _gemini_model(api_key: str):
+    global _GEMINI_MODEL, _GEMINI_KEY
+    with _GEMINI_LOCK:
+        if _GEMINI_MODEL is None or _GEMINI_KEY != api_key:
+            import google.generativeai as genai
+
+            genai.configure(api_key=api_key)
+            _GEMINI_MODEL = genai.GenerativeModel(GEMINI_KEYWORD_MODEL)
+            _GEMINI_KEY = api_key
+        return _GEMINI_MODEL
+
 
 # ---------------------------------------------------------------------------
 # Keyword extraction
 # ---------------------------------------------------------------------------
 
-def extract_keywords(text: str) -> List[str]:
+def _keyword_prompt(text: str) -> str:
+    return (
+        "Extract 3-5 domain-specific technical keywords from this startup idea that would help find similar GitHub projects. "
+        "Focus on: technology names, problem domains, specific tools/platforms mentioned (e.g., 'jira', 'slack', 'transcript'). "
+        "Avoid generic words like 'ai', 'app', 'tool', 'automatically'. "
+        "Return ONLY a valid JSON array of lowercase strings with NO additional text or markdown formatting.\n\n"
+        f"Startup idea: {text}\n\n"
+        "JSON array:"
+    )
+
+
+def _parse_keywords(response) -> List[str] | None:
+    """Keyword list from a Gemini response, or None if it isn't a JSON array."""
+    raw = (getattr(response, "text", "") or "").strip()
+    logger.info(f"Gemini raw response: {raw}")
+
+    # Try to extract JSON from markdown code blocks if present
+    if "```" in raw:
+        json_match = _JSON_BLOCK_RE.search(raw)
+        if json_match:
+            raw = json_match.group(1).strip()
+
+    keywords = orjson.loads(raw)
+    if isinstance(keywords, list):
+        return [str(k).lower() for k in keywords[:5]]
+    return None
+
+
+async def gemini_keywords(text: str) -> List[str] | None:
+    """Gemini-extracted keywords, or None when GEMINI_API_KEY is unset or the call fails.
+
+    Only real Gemini results are returned (and, with PRUNE_KEYWORD_CACHE set,
+    cached on disk), so callers can cache them further without pinning the
+    fallback keywords.
+    """
+    if not os.getenv("GEMINI_API_KEY"):
+        return None
+    cache_key = keyword_cache.make_key(GEMINI_KEYWORD_MODEL, KEYWORD_PROMPT_VERSION, text)
+    if keyword_cache.enabled():
+        cached = await asyncio.to_thread(keyword_cache.get, cache_key)
+        if cached is not None:
+            return cached
+    try:
+        model = _gemini_model(os.getenv("GEMINI_API_KEY"))
+        async with _gemini_sem():
+            response = await model.generate_content_async(_keyword_prompt(text))
+        keywords = _parse_keywords(response)
+        if keywords is not None:
+            if keyword_cache.enabled():
+                await asyncio.to_thread(keyword_cache.set, cache_key, keywords)
+            return keywords
+    except Exception as e:
+        logger.warning(f"Gemini keyword extraction failed: {e}")
+    return None
+
+
+async def extract_keywords_async(text: str) -> List[str]:
     """Extract core keywords from an idea string.
 
     Uses Gemini when GEMINI_API_KEY is set; otherwise falls back to the first
     five non-trivial words of the input (deterministic, no network required).
     """
-    if os.getenv("GEMINI_API_KEY"):
-        try:
-            import google.generativeai as genai
+    keywords = await gemini_keywords(text)
+    return keywords if keywords is not None else fallback_keywords(text)
+
 
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            model = genai.GenerativeModel("gemini-1.5-flash")
-            prompt = (
-                "Extract 3-5 domain-specific technical keywords from this startup idea that would help find similar GitHub projects. "
-                "Focus on: technology names, problem domains, specific tools/platforms mentioned (e.g., 'jira', 'slack', 'transcript'). "
-                "Avoid generic words like 'ai', 'app', 'tool', 'automatically'. "
-                "Return ONLY a valid JSON array of lowercase strings with NO additional text or markdown formatting.\n\n"
-                f"Startup idea: {text}\n\n"
-                "JSON array:"
-            )
-            response = model.generate_content(prompt)
-            raw = (getattr(response, "text", "") or "").strip()
-            logger.info(f"Gemini raw response: {raw}")
-
-            # Try to extract JSON from markdown code blocks if present
-            if "```" in raw:
-                json_match = re.search(r'```(?:json)?\s*([\s\S]*?)```', raw)
-                if json_match:
-                    raw = json_match.group(1).strip()
-
-            keywords = json.loads(raw)
-            if isinstance(keywords, list):
-                return [str(k).lower() for k in keywords[:5]]
-        except Exception as e:
-            logger.warning(f"Gemini keyword extraction failed: {e}")
-
-    # Fallback: first 5 words stripped of punctuation
-    stop_words = {"a", "an", "the", "is", "for", "and", "or", "to", "of", "in", "that", "with"}
+def fallback_keywords(text: str) -> List[str]:
+    """First five non-stop-words of `text`, stripped of punctuation (no network)."""
     words = [
-        w.strip(".,!?;:\"'()[]{}").lower()
-        for w in text.split()
-        if w.strip(".,!?;:\"'()[]{}").lower() not in stop_words
+        w for w in text.translate(_PUNCT_TBL).lower().split()
+        if w not in _EXTRACT_STOP_WORDS
     ]
     return words[:5]
 
@@ -74,28 +257,31 @@ def extract_keywords(text: str) -> List[str]:
 # GitHub query building
 # ---------------------------------------------------------------------------
 
-def build_github_query(keywords: List[str]) -> str:
-    """Build a GitHub search query from extracted keywords."""
-    weak = {
-        "ai", "automatically", "turn", "turns", "build", "building",
-        "make", "makes", "small", "large", "simple", "easy", "quick",
-        "app", "tool", "platform", "system", "using", "based", "create",
-        "auto", "new", "use", "get", "help", "work", "data",
-    }
+# Too generic to narrow a GitHub search on their own
+_WEAK_WORDS = frozenset({
+    "ai", "automatically", "turn", "turns", "build", "building",
+    "make", "makes", "small", "large", "simple", "easy", "quick",
+    "app", "tool", "platform", "system", "using", "based", "create",
+    "auto", "new", "use", "get", "help", "work", "data",
+})
+
+# Useful, but only as a secondary term after more specific keywords
+_TIER2_WORDS = frozenset({
+    "meeting", "task", "ticket", "note", "notes", "summary", "chat",
+    "email", "code", "copilot", "assistant", "agent", "bot", "workflow",
+})
 
-    tier2 = {
-        "meeting", "task", "ticket", "note", "notes", "summary", "chat",
-        "email", "code", "copilot", "assistant", "agent", "bot", "workflow",
-    }
 
+def build_github_query(keywords: List[str]) -> str:
+    """Build a GitHub search query from extracted keywords."""
     t1_terms: List[str] = []
     t2_terms: List[str] = []
 
     for k in keywords:
         kk = (k or "").strip().lower()
-        if not kk or len(kk) < 3 or kk in weak:
+        if not kk or len(kk) < 3 or kk in _WEAK_WORDS:
             continue
-        if kk in tier2:
+        if kk in _TIER2_WORDS:
             t2_terms.append(kk)
         else:
             t1_terms.append(kk)
@@ -113,18 +299,43 @@ def build_github_query(keywords: List[str]) -> str:
 # GitHub search
 # ---------------------------------------------------------------------------
 
-def search_github(query: str) -> dict:
+async def search_github(query: str) -> dict:
     """Search GitHub repositories for the given query string (up to 100 results)."""
     headers = {"Accept": "application/vnd.github+json"}
     token = os.getenv("GITHUB_TOKEN")
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
-    params = {"q": query, "per_page": 100, "sort": "stars", "order": "desc"}
-    resp = requests.get(GITHUB_API_URL, headers=headers, params=params, timeout=10)
+    cached = _ETAG_CACHE.get(query)
+    if cached:
+        headers["If-None-Match"] = cached[0]
 
-    if resp.status_code == 403:
-        raise HTTPException(status_code=403, detail="GitHub API rate limit exceeded or bad token.")
+    params = {"q": query, "per_page": 100, "sort": "stars", "order": "desc"}
+    for attempt in range(_GITHUB_MAX_ATTEMPTS):
+        await _RATE_LIMITER.acquire()
+        async with _github_sem():
+            resp = await _client().get(GITHUB_API_URL, headers=headers, params=params)
+        _RATE_LIMITER.update(resp.headers)
+        if resp.status_code not in (403, 429):
+            break
+        # Only rate limiting is worth retrying; a bad token fails the same way again
+        is_rate_limited = (
+            resp.status_code == 429
+            or "Retry-After" in resp.headers
+            or resp.headers.get("X-RateLimit-Remaining") == "0"
+        )
+        wait = _RATE_LIMITER.retry_after(resp.headers) + random.uniform(0, 2 ** attempt)
+        if not is_rate_limited or attempt == _GITHUB_MAX_ATTEMPTS - 1 or wait > _GITHUB_MAX_WAIT_S:
+            break
+        logger.warning(f"GitHub rate limited ({resp.status_code}), retrying in {wait:.1f}s")
+        await asyncio.sleep(wait)
+
+    if resp.status_code == 304 and cached:
+        _ETAG_CACHE.move_to_end(query)
+        return cached[1]
+
+    if resp.status_code in (403, 429):
+        raise HTTPException(status_code=resp.status_code, detail="GitHub API rate limit exceeded or bad token.")
     if resp.status_code != 200:
         raise HTTPException(status_code=resp.status_code, detail="GitHub API error.")
 
@@ -140,7 +351,15 @@ def search_github(query: str) -> dict:
         }
         for item in data.get("items", [])
     ]
-    return {"total_count": data.get("total_count", 0), "items": items}
+    result = {"total_count": data.get("total_count", 0), "items": items}
+
+    etag = resp.headers.get("ETag")
+    if etag:
+        _ETAG_CACHE[query] = (etag, result)
+        _ETAG_CACHE.move_to_end(query)
+        if len(_ETAG_CACHE) > _ETAG_CACHE_MAX:
+            _ETAG_CACHE.popitem(last=False)
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -153,13 +372,17 @@ _JUNK_MIN_DESC_LEN = 20
 # match_score >= this threshold counts as a "true competitor"
 _HIGH_SIM_THRESHOLD = 3
 
-_STOP_WORDS = {
+# Same word characters as the \b boundaries of the old regex matcher, so
+# `my_tool` stays one word
+_TOKEN_RE = re.compile(r"\w+")
+
+_STOP_WORDS = frozenset({
     "a", "an", "the", "is", "for", "and", "or", "to", "of", "in",
     "that", "with", "into", "from", "as", "at", "by", "on", "it",
     "its", "be", "are", "was", "were", "will", "can", "has", "have",
     "small", "large", "turns", "turn", "make", "makes", "automatically",
     "auto", "using", "used", "uses", "build", "built", "based",
-}
+})
 
 
 def _is_junk_repo(repo: dict) -> bool:
@@ -172,22 +395,70 @@ def _is_junk_repo(repo: dict) -> bool:
     return False
 
 
-def _score_repo(idea_words: List[str], kw_lower: List[str], repo: dict) -> int:
-    """Score a single repo against the idea words and keywords.
+@lru_cache(maxsize=1024)
+def _text_ngrams(name: str, description: str, n: int) -> frozenset:
+    """Contiguous n-token runs of one name + description pair (memoized)."""
+    tokens = _TOKEN_RE.findall((name + " " + description).lower())
+    return frozenset(zip(*(tokens[i:] for i in range(n))))
+
+
+def _repo_has(repo: dict, term: tuple) -> bool:
+    """Whole-word match of a tokenized term; multi-word terms must appear in order."""
+    return term in _text_ngrams(repo.get("name", ""), repo.get("description") or "", len(term))
+
+
+@lru_cache(maxsize=256)
+def _idea_words(idea: str) -> tuple:
+    """Significant idea words (de-duped, no stop words, length > 3), memoized per idea."""
+    seen: set = set()
+    words: List[str] = []
+    for w in idea.lower().translate(_PUNCT_TBL).split():
+        if len(w) > 3 and w not in _STOP_WORDS and w not in seen:
+            seen.add(w)
+            words.append(w)
+    return tuple(words)
+
+
+def _term_tokens(words: List[str]) -> List[tuple]:
+    """Tokenize each distinct term into the token sequence it must match."""
+    terms = {tuple(_TOKEN_RE.findall(w)) for w in words}
+    return [t for t in terms if t]
+
+
+def _weighted_terms(kw_lower: List[str], idea_words: tuple) -> List[tuple]:
+    """Merge keywords (weight 3) and idea words (weight 1) into one (term, weight) list.
+
+    A word that is both a keyword and an idea word keeps the keyword weight
+    instead of scoring 3 + 1.
+    """
+    weights: dict = {}
+    for t in _term_tokens(kw_lower):
+        weights[t] = 3
+    for t in _term_tokens(idea_words):
+        weights.setdefault(t, 1)
+    return list(weights.items())
+
+
+def _score_repo(terms: List[tuple], repo: dict) -> int:
+    """Score a single repo against the pre-tokenized, weighted search terms.
     
     Scoring:
       +3 per extracted keyword matched (whole-word) in name+description
-      +1 per significant idea word matched (whole-word)
+      +1 per significant idea word matched (whole-word), unless it is also a keyword
     """
-    text = (repo.get("name", "") + " " + (repo.get("description") or "")).lower()
-    score = 0
-    for kw in kw_lower:
-        if re.search(r'\b' + re.escape(kw) + r'\b', text):
-            score += 3
-    for word in idea_words:
-        if re.search(r'\b' + re.escape(word) + r'\b', text):
-            score += 1
-    return score
+    return sum(w for t, w in terms if _repo_has(repo, t))
+
+
+def _display_repo(repo: dict) -> dict:
+    """Just the fields the client renders; internal ones like `fork` stay server-side."""
+    return {
+        "name": repo.get("name", ""),
+        "description": repo.get("description", ""),
+        "stars": repo.get("stars", 0),
+        "url": repo.get("url", ""),
+        "language": repo.get("language", ""),
+        "match_score": repo.get("match_score", 0),
+    }
 
 
 def filter_score_repos(idea: str, keywords: List[str], repos: List[dict], display_n: int = 12) -> dict:
@@ -199,17 +470,12 @@ def filter_score_repos(idea: str, keywords: List[str], repos: List[dict], displa
       filtered_count   – total repos after junk removal
       total_scored     – repos with any similarity score ≥ 1
     """
-    # Build idea word list (de-duped, no stop words, length > 3)
-    seen: set = set()
-    idea_words: List[str] = []
-    for w in idea.split():
-        clean = w.strip(".,!?;:\"'()[]{}").lower()
-        if len(clean) > 3 and clean not in _STOP_WORDS and clean not in seen:
-            seen.add(clean)
-            idea_words.append(clean)
-
+    idea_words = _idea_words(idea)
     kw_lower = [k.lower() for k in keywords if k.lower() not in _STOP_WORDS]
 
+    # Tokenize the search terms once per request, not once per repo
+    terms = _weighted_terms(kw_lower, idea_words)
+
     # Step 1: remove junk repos
     clean_repos = [r for r in repos if not _is_junk_repo(r)]
     logger.info(f"GitHub: {len(repos)} fetched → {len(clean_repos)} after junk filter")
@@ -217,7 +483,7 @@ def filter_score_repos(idea: str, keywords: List[str], repos: List[dict], displa
     # Step 2: score all clean repos
     scored: List[dict] = []
     for repo in clean_repos:
-        s = _score_repo(idea_words, kw_lower, repo)
+        s = _score_repo(terms, repo)
         if s >= 1:
             scored.append({**repo, "match_score": s})
 
@@ -241,7 +507,7 @@ def filter_score_repos(idea: str, keywords: List[str], repos: List[dict], displa
         top_matches = sorted(clean_repos, key=lambda r: r.get("stars", 0), reverse=True)[:5]
 
     return {
-        "top_matches": top_matches,
+        "top_matches": [_display_repo(r) for r in top_matches],
         "high_sim_count": high_sim_count,
         "filtered_count": len(clean_repos),
         "total_scored": len(scored),
@@ -265,10 +531,6 @@ def compute_relevance(keywords: List[str], repos: List[dict]) -> float:
     """Score how relevant the returned repos are to the keywords (0–1)."""
     if not repos:
         return 0.0
-    kw_lower = [k.lower() for k in keywords]
-    matches = sum(
-        1 for repo in repos
-        if any(kw in (repo.get("name", "") + " " + (repo.get("description") or "")).lower()
-               for kw in kw_lower)
-    )
+    kw_terms = _term_tokens([k.lower() for k in keywords])
+    matches = sum(1 for repo in repos if any(_repo_has(repo, t) for t in kw_terms))
     return matches / len(repos)
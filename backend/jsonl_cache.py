@@ -0,0 +1,104 @@
+"""
+Append-only JSON-lines disk cache shared by keyword_cache and llm_cache.
+Each entry is one {"k": key, "v": value} line; the file is loaded into memory
+on first use, later lines superseding earlier ones for the same key. Only the
+newest `max_entries` are kept, and the file is rewritten with just those once
+it has grown to twice that many lines.
+Methods do blocking file I/O; async callers run them via asyncio.to_thread.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlCache:
+    def __init__(
+        self,
+        path: str,
+        label: str,
+        is_valid: Callable[[Any], bool],
+        max_entries: int = 10_000,
+    ) -> None:
+        self.path = path
+        self.label = label
+        self.is_valid = is_valid
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Any] | None" = None
+        self._lines = 0  # lines in the file, including superseded entries
+
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _load(self) -> "OrderedDict[str, Any]":
+        if self._entries is None:
+            self._entries = OrderedDict()
+            try:
+                with open(self.path, "rb") as f:
+                    for line in f:
+                        self._lines += 1
+                        try:
+                            row = orjson.loads(line)
+                            self._entries[row["k"]] = row["v"]
+                            self._entries.move_to_end(row["k"])
+                        except (orjson.JSONDecodeError, KeyError, TypeError):
+                            continue  # skip torn / malformed lines
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"{self.label} unreadable ({self.path}): {e}")
+            self._trim()
+        return self._entries
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _compact(self) -> None:
+        """Rewrite the file with only the live entries."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for k, v in self._entries.items():
+                f.write(orjson.dumps({"k": k, "v": v}) + b"\n")
+        os.replace(tmp_path, self.path)
+        self._lines = len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or None on a miss, a malformed entry or when disabled."""
+        if not self.enabled():
+            return None
+        with self._lock:
+            entries = self._load()
+            value = entries.get(key)
+            if value is None:
+                return None
+            if not self.is_valid(value):
+                del entries[key]  # revalidate on recall; drop bad entries
+                return None
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in memory and append it to the file."""
+        if not self.enabled() or not self.is_valid(value):
+            return
+        with self._lock:
+            entries = self._load()
+            entries[key] = value
+            entries.move_to_end(key)
+            self._trim()
+            try:
+                if self._lines >= 2 * self.max_entries:
+                    self._compact()
+                else:
+                    with open(self.path, "ab") as f:
+                        f.write(orjson.dumps({"k": key, "v": value}) + b"\n")
+                    self._lines += 1
+            except OSError as e:
+                logger.warning(f"{self.label} not persisted ({self.path}): {e}")
@@ -0,0 +1,38 @@
+"""
+Opt-in persistent cache for Gemini keyword extraction.
+Maps a content hash of (model, prompt version, idea) to the extracted keyword
+list. Enabled only when PRUNE_KEYWORD_CACHE names a file; storage is a
+JsonlCache (see jsonl_cache), so async callers go through asyncio.to_thread.
+"""
+
+import hashlib
+import os
+
+from jsonl_cache import JsonlCache
+
+
+def _is_valid(value) -> bool:
+    return isinstance(value, list) and all(isinstance(k, str) for k in value)
+
+
+_CACHE = JsonlCache(os.getenv("PRUNE_KEYWORD_CACHE", ""), "Keyword cache", _is_valid)
+
+
+def enabled() -> bool:
+    return _CACHE.enabled()
+
+
+def make_key(model: str, prompt_version: str, text: str) -> str:
+    """Content address for one extraction request."""
+    return hashlib.sha256(f"{model}|{prompt_version}|{text}".encode()).hexdigest()
+
+
+def get(key: str) -> list[str] | None:
+    """Return the cached keywords, or None on a miss, a malformed entry or when disabled."""
+    value = _CACHE.get(key)
+    return list(value) if value is not None else None
+
+
+def set(key: str, value: list[str]) -> None:
+    """Store keywords in memory and append them to the cache file."""
+    _CACHE.set(key, value)
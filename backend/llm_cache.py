@@ -0,0 +1,43 @@
+"""
+Opt-in disk cache for OpenAI responses, for development and test runs.
+Maps a content hash of (model, temperature, system, user) to the raw response
+text so re-running the engine on the same inputs makes no API calls.
+Enabled only when PRUNE_LLM_CACHE names a file; production leaves it unset.
+Storage is a JsonlCache (see jsonl_cache), so async callers go through
+asyncio.to_thread.
+"""
+
+import hashlib
+import os
+
+from jsonl_cache import JsonlCache
+
+
+def _is_valid(value) -> bool:
+    return isinstance(value, str) and bool(value)
+
+
+_CACHE = JsonlCache(os.getenv("PRUNE_LLM_CACHE", ""), "LLM cache", _is_valid)
+
+
+def enabled() -> bool:
+    return _CACHE.enabled()
+
+
+def make_key(model: str, temperature: float, system: str, user: str) -> str:
+    """Content address for one chat completion request."""
+    h = hashlib.sha256()
+    for part in (model, repr(temperature), system, user):
+        h.update(part.encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached response text, or None on a miss or when disabled."""
+    return _CACHE.get(key)
+
+
+def set(key: str, value: str) -> None:
+    """Store a response in memory and append it to the cache file."""
+    _CACHE.set(key, value)
@@ -8,7 +8,8 @@ Routes:
   POST /github/search          → GitHub competition search
   POST /websearch              → Web search for competitive companies
   POST /analyze                → Full analysis (GitHub + Reddit)
-  POST /analyze/stream         → SSE streaming Reddit analysis
+  POST /analyze/stream         → SSE streaming full analysis
+  POST /analyze/batch          → Full analysis for up to 10 ideas at once
   POST /reddit/analyze         → Reddit-only analysis
   GET  /health
   GET  /debug/env              → Debug environment variables
@@ -18,17 +19,19 @@ Run with:
 """
 
 import asyncio
-import json
 import logging
 import os
+from contextlib import aclosing, asynccontextmanager
 from pathlib import Path
-from typing import AsyncGenerator, List
+from typing import Any, AsyncGenerator, Awaitable, Callable, List
 
-import requests
+import httpx
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 try:
@@ -37,15 +40,19 @@ try:
 except Exception:
     load_dotenv()
 
-from engine import run_reddit_signal_engine
+import result_cache
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from engine import MODEL as ENGINE_MODEL, run_reddit_signal_engine
 from github_client import (
     build_github_query,
+    close_github_client,
     compute_competition_risk,
     filter_score_repos,
-    extract_keywords,
+    fallback_keywords,
+    gemini_keywords,
     search_github,
 )
-from models import AnalysisResponse, Scores, SignalThread, StartupInput
+from models import StartupInput
 from websearch import WebSearchError, websearch_idea
 
 logging.basicConfig(
@@ -54,10 +61,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_github_client()
+    await result_cache.close()
+
+
+class _ORJSONResponse(ORJSONResponse):
+    """orjson response that, like the SSE frames, tolerates non-string dict keys."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
 app = FastAPI(
     title="Prune — PreMortem Market Signal Engine",
     description="GitHub competition signals + Web search + Agentic Reddit signal analysis",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=_ORJSONResponse,
 )
 
 # CORS
@@ -69,7 +92,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-GITHUB_API_URL = "https://api.github.com/search/repositories"
+# Compress JSON responses (repo lists, reports); small bodies aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# How long /analyze waits for Gemini keywords before settling for the
+# fallback keywords (whose GitHub search is already in flight)
+GEMINI_KEYWORD_TIMEOUT_S = 1.5
+
+# Idle gap after which the SSE stream sends a keep-alive comment
+SSE_PING_INTERVAL_S = 15
+
+# Fail fast on an upstream that keeps failing instead of paying its timeout on
+# every request. For GitHub only outages count — rate limits and bad queries
+# are already answered without retrying.
+def _is_github_outage(e: Exception) -> bool:
+    return isinstance(e, httpx.HTTPError) or (
+        isinstance(e, HTTPException) and e.status_code >= 500
+    )
+
+
+_GITHUB_BREAKER = CircuitBreaker("GitHub", is_failure=_is_github_outage)
+_WEBSEARCH_BREAKER = CircuitBreaker("WebSearch")
+_REDDIT_BREAKER = CircuitBreaker("Reddit")
+
+# request key -> the in-flight /analyze run that identical requests join
+_INFLIGHT: dict[str, asyncio.Future] = {}
+
+# Keyword extractions that outlived their request's timeout; held here so they
+# finish in the background and warm the keyword caches for the next request
+_BACKGROUND: set[asyncio.Task] = set()
 
 
 # ---------------------------------------------------------------------------
@@ -77,14 +128,18 @@ GITHUB_API_URL = "https://api.github.com/search/repositories"
 # ---------------------------------------------------------------------------
 
 class IdeaRequest(BaseModel):
-    idea: str
+    idea: str = Field(..., max_length=2000)
+
+
+class BatchAnalyzeRequest(BaseModel):
+    ideas: List[StartupInput] = Field(..., min_length=1, max_length=10)
 
 
 class WebSearchRequest(BaseModel):
-    idea: str = Field(..., min_length=1)
-    problem: str = ""
-    solution: str = ""
-    product_specs: str = ""
+    idea: str = Field(..., min_length=1, max_length=2000)
+    problem: str = Field("", max_length=4000)
+    solution: str = Field("", max_length=4000)
+    product_specs: str = Field("", max_length=4000)
     max_companies: int = Field(6, ge=1, le=20)
     max_pages_per_company: int = Field(4, ge=1, le=10)
 
@@ -121,11 +176,11 @@ def debug_env() -> dict:
 
 
 @app.post("/github/search")
-def github_search(body: IdeaRequest):
+async def github_search(body: IdeaRequest):
     """Search GitHub directly for the raw idea string."""
-    keywords = extract_keywords(body.idea)
+    keywords = await _keywords(body.idea)
     query = build_github_query(keywords)
-    result = search_github(query)
+    result = await _github_search(query)
     repo_analysis = filter_score_repos(body.idea, keywords, result["items"])
     competition_risk = compute_competition_risk(repo_analysis["high_sim_count"])
     return {
@@ -157,172 +212,241 @@ def websearch(req: WebSearchRequest) -> dict:
         raise HTTPException(status_code=500, detail=f"websearch failed: {e}")
 
 
+# SSE comment line; EventSource and the frontend's "data: " parser ignore it
+_SSE_PING = b": ping\n\n"
+
+
+def _sse(payload: dict) -> bytes:
+    """Encode one Server-Sent Event frame."""
+    return b"data: " + orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+
 @app.post("/analyze/stream")
 async def analyze_stream(body: StartupInput):
     """Streaming analysis pipeline with progress updates."""
     async def event_generator():
         try:
-            # Step 1: Extract keywords
-            yield f"data: {json.dumps({'step': 0, 'status': 'complete'})}\n\n"
-            keywords = extract_keywords(body.idea)
-            
-            # Step 2: GitHub search
-            yield f"data: {json.dumps({'step': 1, 'status': 'complete'})}\n\n"
-            query = build_github_query(keywords)
-            github_result = search_github(query)
-            repo_analysis = filter_score_repos(body.idea, keywords, github_result["items"])
-            github_competition_risk = compute_competition_risk(repo_analysis["high_sim_count"])
-            github_relevance = repo_analysis["high_sim_count"] / max(repo_analysis["filtered_count"], 1)
-            top_repos = repo_analysis["top_matches"]
-            
-            # Step 3: Web search (Gemini)
-            yield f"data: {json.dumps({'step': 2, 'status': 'complete'})}\n\n"
-            websearch_data = None
-            websearch_competition_risk = 0.0
-            try:
-                websearch_data = websearch_idea(
-                    body.idea,
-                    problem=body.problem,
-                    solution=body.solution,
-                    product_specs=body.product_specs,
-                    max_companies=6,
-                    max_pages_per_company=4,
-                )
-                num_companies = len(websearch_data.get("companies", []))
-                websearch_competition_risk = min(num_companies / 10.0, 1.0)
-            except Exception as e:
-                logger.warning(f"WebSearch failed: {e}")
-                websearch_data = {"companies": [], "deep_dives": []}
-            
-            # Step 4: Reddit analysis (only in deep mode)
-            reddit_data = None
-            reddit_scores = {}
-            if body.deep_mode:
-                yield f"data: {json.dumps({'step': 3, 'status': 'complete'})}\n\n"
-                openai_key = os.getenv("OPENAI_API_KEY")
-                if openai_key:
-                    try:
-                        reddit_data = await run_reddit_signal_engine(
-                            openai_api_key=openai_key,
-                            idea=body.idea,
-                            problem=body.problem,
-                            solution=body.solution,
-                            product_specs=body.product_specs,
-                        )
-                        reddit_scores = reddit_data.get("scores", {})
-                    except Exception as e:
-                        logger.warning(f"Reddit analysis failed: {e}")
-                        reddit_data = {"report": "", "scores": {}, "threads": []}
-                else:
-                    logger.warning("OPENAI_API_KEY not set, skipping Reddit analysis")
-                    reddit_data = {"report": "", "scores": {}, "threads": []}
-            else:
-                logger.info("Skipping Reddit analysis (basic mode)")
-                reddit_data = {"report": "", "scores": {}, "threads": []}
-                yield f"data: {json.dumps({'step': 3, 'status': 'skipped'})}\n\n"
-            
-            # Step 5: Compute scores
-            final_step = 4 if body.deep_mode else 3
-            yield f"data: {json.dumps({'step': final_step, 'status': 'complete'})}\n\n"
-            
-            # Weighted scoring (adjust weights based on mode)
-            if body.deep_mode:
-                GITHUB_WEIGHT = 0.30
-                WEBSEARCH_WEIGHT = 0.35
-                REDDIT_WEIGHT = 0.35
-            else:
-                # Basic mode: only GitHub + WebSearch
-                GITHUB_WEIGHT = 0.45
-                WEBSEARCH_WEIGHT = 0.55
-                REDDIT_WEIGHT = 0.0
-            
-            github_score = github_competition_risk * 100
-            websearch_score = websearch_competition_risk * 100
-            reddit_competition = reddit_scores.get("competition_risk", 50)
-            
-            combined_competition_risk = (
-                github_score * GITHUB_WEIGHT +
-                websearch_score * WEBSEARCH_WEIGHT +
-                reddit_competition * REDDIT_WEIGHT
-            )
-            
-            demand_score = reddit_scores.get("demand_score", 50)
-            pain_validation = reddit_scores.get("pain_validation", 50)
-            
-            overall_failure_probability = (
-                combined_competition_risk * 0.4 +
-                (100 - demand_score) * 0.35 +
-                (100 - pain_validation) * 0.25
-            )
-            
-            # Send final result
-            result = {
-                "idea": body.idea,
-                "keywords": keywords,
-                "scores": {
-                    "competition_risk": round(combined_competition_risk, 1),
-                    "demand_score": round(demand_score, 1),
-                    "pain_validation": round(pain_validation, 1),
-                    "overall_failure_probability": round(overall_failure_probability, 1),
-                    "breakdown": {
-                        "github_competition": round(github_score, 1),
-                        "websearch_competition": round(websearch_score, 1),
-                        "reddit_competition": round(reddit_competition, 1),
-                    },
-                },
-                "github": {
-                    "query": query,
-                    "total_count": github_result["total_count"],
-                    "filtered_count": repo_analysis["filtered_count"],
-                    "high_sim_count": repo_analysis["high_sim_count"],
-                    "competition_risk": github_competition_risk,
-                    "relevance_score": round(github_relevance, 3),
-                    "repositories": top_repos,
-                },
-                "websearch": {
-                    "companies": websearch_data.get("companies", []),
-                    "deep_dives": websearch_data.get("deep_dives", []),
-                    "num_companies_found": len(websearch_data.get("companies", [])),
-                },
-                "reddit": {
-                    "report": reddit_data.get("report", ""),
-                    "threads": reddit_data.get("threads", []),
-                    "iterations": reddit_data.get("iterations", 0),
-                    "coverage": reddit_data.get("coverage", {}),
-                },
-                "weights": {
-                    "github": GITHUB_WEIGHT,
-                    "websearch": WEBSEARCH_WEIGHT,
-                    "reddit": REDDIT_WEIGHT,
-                },
-            }
-            
-            yield f"data: {json.dumps({'step': 'done', 'result': result})}\n\n"
-            
+            async with aclosing(_run_pipeline(body)) as pipeline:
+                async for event in pipeline:
+                    yield _SSE_PING if event is None else _sse(event)
         except Exception as e:
             logger.error(f"Stream error: {e}")
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield _sse({'error': str(e)})
     
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    # identity encoding tells GZipMiddleware to leave the stream alone —
+    # buffering for compression would delay progress events; X-Accel-Buffering
+    # asks nginx-style proxies not to hold them back either
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Content-Encoding": "identity",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
-@app.post("/analyze")
-async def analyze(body: StartupInput):
-    """Full analysis pipeline: GitHub + WebSearch + Reddit with weighted scoring."""
-    # === GITHUB ANALYSIS ===
-    keywords = extract_keywords(body.idea)
-    query = build_github_query(keywords)
-    github_result = search_github(query)
-    repo_analysis = filter_score_repos(body.idea, keywords, github_result["items"])
-    github_competition_risk = compute_competition_risk(repo_analysis["high_sim_count"])
+async def _run_pipeline(body: StartupInput) -> AsyncGenerator[dict | None, None]:
+    """
+    The full analysis, shared by /analyze and /analyze/stream.
+    Yields progress events as the sources finish, None as an idle heartbeat,
+    and finally {'step': 'done', 'result': ...}. GitHub errors propagate.
+    """
+    # With the result cache on, keywords are resolved up front (bounded by the
+    # Gemini timeout) to key the lookup, and handed to the GitHub branch so
+    # Gemini is asked only once. Without it, GitHub resolves them speculatively.
+    keywords = None
+    cache_key = None
+    if result_cache.enabled():
+        keywords = await _timely_keywords(body.idea)
+        cache_key = _analysis_cache_key(body, keywords)
+        cached = await result_cache.get(cache_key)
+        if cached is not None:
+            # Replay a hit as the terminal event alone; the protocol is unchanged
+            yield {'step': 'done', 'result': {**cached, 'idea': body.idea}}
+            return
+
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def reddit_status(stage: str, detail: str):
+        await events.put({'step': 3, 'status': 'progress', 'stage': stage, 'detail': detail})
+
+    # The three sources run side by side; each step event is sent as its
+    # source finishes, GitHub data included, instead of in a fixed order
+    github_task = asyncio.create_task(_github_analysis(body.idea, keywords))
+    websearch_task = asyncio.create_task(_websearch_analysis(body))
+    reddit_task = asyncio.create_task(_reddit_analysis(body, on_status=reddit_status))
+    pending = {github_task, websearch_task, reddit_task}
+    try:
+        # Step 1: Extract keywords
+        yield {'step': 0, 'status': 'complete'}
+
+        while pending:
+            async for event in _relay(pending, events):
+                yield event
+            finished = {t for t in pending if t.done()}
+            pending -= finished
+
+            # Step 2: GitHub search — errors abort the pipeline
+            if github_task in finished:
+                github = github_task.result()
+                yield {
+                    'step': 1,
+                    'status': 'complete',
+                    'keywords': github["keywords"],
+                    'github': _github_payload(github),
+                }
+
+            # Step 3: Web search (Gemini)
+            if websearch_task in finished:
+                yield {'step': 2, 'status': 'complete'}
+
+            # Step 4: Reddit analysis (only in deep mode)
+            if reddit_task in finished:
+                status = 'complete' if body.deep_mode else 'skipped'
+                yield {'step': 3, 'status': status}
+
+        websearch_data = websearch_task.result()
+        reddit_data = reddit_task.result()
+
+        # Step 5: Compute scores
+        final_step = 4 if body.deep_mode else 3
+        yield {'step': final_step, 'status': 'complete'}
+        result = _analysis_result(body, github, websearch_data, reddit_data)
+        await _store_analysis(cache_key, result, websearch_data, reddit_data)
+
+        yield {'step': 'done', 'result': result}
+    finally:
+        # Client disconnected or GitHub failed — don't leave work running
+        for task in pending:
+            task.cancel()
+
+
+async def _relay(tasks: set, events: asyncio.Queue) -> AsyncGenerator[dict | None, None]:
+    """
+    Yield queued status events until any of `tasks` finishes, then flush the
+    rest. None is yielded after SSE_PING_INTERVAL_S of silence so the stream
+    can keep proxies from dropping the connection during long Reddit runs.
+    """
+    while not any(t.done() for t in tasks):
+        getter = asyncio.ensure_future(events.get())
+        done, _ = await asyncio.wait(
+            {*tasks, getter},
+            timeout=SSE_PING_INTERVAL_S,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if getter in done:
+            yield getter.result()
+        else:
+            getter.cancel()
+            if not done:
+                yield None
+    while not events.empty():
+        yield events.get_nowait()
+
+
+async def _keywords(idea: str) -> List[str]:
+    """
+    Keyword extraction behind the result cache. Only Gemini results are
+    cached; the fallback keywords after a Gemini failure are not, so the next
+    request gets another chance at real keywords.
+    """
+    key = result_cache.make_key("kw", idea)
+    cached = await result_cache.get(key)
+    if cached is not None:
+        return cached
+    keywords = await gemini_keywords(idea)
+    if keywords is None:
+        return fallback_keywords(idea)
+    await result_cache.set(key, result_cache.KW_TTL, keywords)
+    return keywords
+
+
+async def _github_search(query: str) -> dict:
+    """search_github behind the result cache and the GitHub circuit breaker."""
+    try:
+        return await result_cache.cached(
+            result_cache.make_key("gh", query),
+            result_cache.GH_TTL,
+            lambda: _GITHUB_BREAKER.call(search_github, query),
+        )
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+async def _timely_keywords(idea: str) -> List[str]:
+    """
+    _keywords, or the fallback keywords if Gemini takes longer than
+    GEMINI_KEYWORD_TIMEOUT_S. A slow Gemini call is not cancelled, so its
+    keywords still reach the caches.
+    """
+    gemini_task = asyncio.create_task(_keywords(idea))
+    # asyncio.wait leaves a slow Gemini call running instead of cancelling it
+    done, _ = await asyncio.wait({gemini_task}, timeout=GEMINI_KEYWORD_TIMEOUT_S)
+    if done:
+        return gemini_task.result()
+    logger.info("Gemini keywords too slow, using fallback keywords")
+    _BACKGROUND.add(gemini_task)
+    gemini_task.add_done_callback(_BACKGROUND.discard)
+    gemini_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return fallback_keywords(idea)
+
+
+async def _github_analysis(idea: str, keywords: List[str] | None = None) -> dict:
+    """
+    Keywords → GitHub search → repo scoring. HTTP errors propagate.
+    Keywords already resolved by the caller are used as given. Otherwise the
+    search for the deterministic fallback keywords starts immediately,
+    speculatively, while Gemini extracts keywords; it is used as-is if Gemini
+    is slow or yields the same query, and cancelled otherwise.
+    """
+    if keywords is not None:
+        query = build_github_query(keywords)
+        github_result = await _github_search(query)
+    else:
+        fallback_query = build_github_query(fallback_keywords(idea))
+        fallback_search = asyncio.create_task(_github_search(fallback_query))
+        # Mark the exception retrieved if the speculative search fails unused
+        fallback_search.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        keywords = await _timely_keywords(idea)
+        query = build_github_query(keywords)
+        if query == fallback_query:
+            github_result = await fallback_search
+        else:
+            fallback_search.cancel()
+            github_result = await _github_search(query)
+    repo_analysis = filter_score_repos(idea, keywords, github_result["items"])
+    return {
+        "keywords": keywords,
+        "query": query,
+        "result": github_result,
+        "repo_analysis": repo_analysis,
+    }
+
+
+def _github_payload(github: dict) -> dict:
+    """The `github` section of an analysis result, from _github_analysis output."""
+    repo_analysis = github["repo_analysis"]
     github_relevance = repo_analysis["high_sim_count"] / max(repo_analysis["filtered_count"], 1)
-    top_repos = repo_analysis["top_matches"]
-    
-    # === WEB SEARCH ANALYSIS ===
-    websearch_data = None
-    websearch_competition_risk = 0.0
+    return {
+        "query": github["query"],
+        "total_count": github["result"]["total_count"],
+        "filtered_count": repo_analysis["filtered_count"],
+        "high_sim_count": repo_analysis["high_sim_count"],
+        "competition_risk": compute_competition_risk(repo_analysis["high_sim_count"]),
+        "relevance_score": round(github_relevance, 3),
+        "repositories": repo_analysis["top_matches"],
+    }
+
+
+async def _websearch_analysis(body: StartupInput) -> dict:
+    """Blocking web search run in a worker thread; empty result on failure."""
     try:
-        websearch_data = websearch_idea(
+        return await _WEBSEARCH_BREAKER.call(
+            asyncio.to_thread,
+            websearch_idea,
             body.idea,
             problem=body.problem,
             solution=body.solution,
@@ -330,37 +454,126 @@ async def analyze(body: StartupInput):
             max_companies=6,
             max_pages_per_company=4,
         )
-        # Calculate competition risk from number of similar companies found
-        num_companies = len(websearch_data.get("companies", []))
-        websearch_competition_risk = min(num_companies / 10.0, 1.0)  # 10+ companies = max risk
     except Exception as e:
         logger.warning(f"WebSearch failed: {e}")
-        websearch_data = {"companies": [], "deep_dives": []}
+        return {"companies": [], "deep_dives": [], "error": str(e)}
+
+
+async def _reddit_analysis(body: StartupInput, on_status=None) -> dict:
+    """Reddit signal engine (deep mode only); empty result when skipped or failed."""
+    empty = {"report": "", "scores": {}, "threads": []}
+    if not body.deep_mode:
+        logger.info("Skipping Reddit analysis (basic mode)")
+        return empty
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if not openai_key:
+        logger.warning("OPENAI_API_KEY not set, skipping Reddit analysis")
+        return empty
+    try:
+        return await result_cache.cached(
+            result_cache.make_key(
+                "reddit", body.idea, body.problem, body.solution,
+                body.product_specs, ENGINE_MODEL,
+            ),
+            result_cache.REDDIT_TTL,
+            lambda: _REDDIT_BREAKER.call(
+                run_reddit_signal_engine,
+                openai_api_key=openai_key,
+                idea=body.idea,
+                problem=body.problem,
+                solution=body.solution,
+                product_specs=body.product_specs,
+                on_status=on_status,
+            ),
+        )
+    except Exception as e:
+        logger.warning(f"Reddit analysis failed: {e}")
+        return {**empty, "error": str(e)}
+
+
+def _analysis_cache_key(body: StartupInput, keywords: List[str]) -> str:
+    """
+    Cache key for a whole analysis, fingerprinted on the extracted keywords
+    rather than the raw idea text so rephrasings of the same idea share an
+    entry. Problem, solution and product specs feed the web search and Reddit
+    prompts, so they are part of the key verbatim.
+    """
+    fingerprint = sorted({k.lower() for k in keywords})
+    mode = "deep" if body.deep_mode else "basic"
+    return result_cache.make_key(
+        "analyze", mode, body.problem, body.solution, body.product_specs, *fingerprint
+    )
+
+
+async def _store_analysis(key: str | None, result: dict, websearch_data: dict, reddit_data: dict) -> None:
+    """Cache a finished analysis unless a source fell back to an empty result."""
+    if key and "error" not in websearch_data and "error" not in reddit_data:
+        await result_cache.set(key, result_cache.ANALYZE_TTL, result)
+
+
+async def _coalesce(key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Share one run of fn() between concurrent callers with the same key.
+    The run is shielded, so one caller disconnecting doesn't fail the others.
+    """
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fn())
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    return await asyncio.shield(task)
+
+
+@app.post("/analyze")
+async def analyze(body: StartupInput):
+    """Full analysis pipeline: GitHub + WebSearch + Reddit with weighted scoring."""
+    # Identical requests arriving together share one pipeline run
+    key = result_cache.make_key("inflight", body.model_dump_json())
+    return await _coalesce(key, lambda: _analyze(body))
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(req: BatchAnalyzeRequest):
+    """Analyze several ideas concurrently; one failing idea doesn't fail the batch."""
+    results = await asyncio.gather(
+        *(analyze(body) for body in req.ideas),
+        return_exceptions=True,
+    )
+    out = []
+    for body, result in zip(req.ideas, results):
+        # BaseException: a cancelled item comes back as CancelledError
+        if isinstance(result, BaseException):
+            logger.warning(f"Batch analysis failed for {body.idea!r}: {result!r}")
+            out.append({
+                "input": body.model_dump(),
+                "error": getattr(result, "detail", str(result) or type(result).__name__),
+            })
+        else:
+            out.append({"input": body.model_dump(), "result": result})
+    return out
+
+
+async def _analyze(body: StartupInput) -> dict:
+    async with aclosing(_run_pipeline(body)) as pipeline:
+        async for event in pipeline:
+            if event and event.get('step') == 'done':
+                return event['result']
+
+
+def _analysis_result(body: StartupInput, github: dict, websearch_data: dict, reddit_data: dict) -> dict:
+    """Combine the three source results into the weighted analysis response."""
+    # === GITHUB ANALYSIS ===
+    keywords = github["keywords"]
+    github_payload = _github_payload(github)
+    github_competition_risk = github_payload["competition_risk"]
+    
+    # === WEB SEARCH ANALYSIS ===
+    # Calculate competition risk from number of similar companies found
+    num_companies = len(websearch_data.get("companies", []))
+    websearch_competition_risk = min(num_companies / 10.0, 1.0)  # 10+ companies = max risk
     
     # === REDDIT ANALYSIS (only in deep mode) ===
-    reddit_data = None
-    reddit_scores = {}
-    if body.deep_mode:
-        openai_key = os.getenv("OPENAI_API_KEY")
-        if openai_key:
-            try:
-                reddit_data = await run_reddit_signal_engine(
-                    openai_api_key=openai_key,
-                    idea=body.idea,
-                    problem=body.problem,
-                    solution=body.solution,
-                    product_specs=body.product_specs,
-                )
-                reddit_scores = reddit_data.get("scores", {})
-            except Exception as e:
-                logger.warning(f"Reddit analysis failed: {e}")
-                reddit_data = {"report": "", "scores": {}, "threads": []}
-        else:
-            logger.warning("OPENAI_API_KEY not set, skipping Reddit analysis")
-            reddit_data = {"report": "", "scores": {}, "threads": []}
-    else:
-        logger.info("Skipping Reddit analysis (basic mode)")
-        reddit_data = {"report": "", "scores": {}, "threads": []}
+    reddit_scores = reddit_data.get("scores", {})
     
     # === WEIGHTED SCORING SYSTEM ===
     # Weights adjust based on mode
@@ -415,15 +628,7 @@ async def analyze(body: StartupInput):
                 "reddit_competition": round(reddit_competition, 1),
             },
         },
-        "github": {
-            "query": query,
-            "total_count": github_result["total_count"],
-            "filtered_count": repo_analysis["filtered_count"],
-            "high_sim_count": repo_analysis["high_sim_count"],
-            "competition_risk": github_competition_risk,
-            "relevance_score": round(github_relevance, 3),
-            "repositories": top_repos,
-        },
+        "github": github_payload,
         "websearch": {
             "companies": websearch_data.get("companies", []),
             "deep_dives": websearch_data.get("deep_dives", []),
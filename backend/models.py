@@ -1,18 +1,18 @@
 """
 Pydantic models for API request / response.
 """
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
 
 
 class StartupInput(BaseModel):
     """What the founder provides."""
-    idea: str = Field(..., description="One-line startup idea", min_length=5)
-    problem: str = Field(default="", description="The problem being solved")
-    solution: str = Field(default="", description="How the product solves it")
+    idea: str = Field(..., description="One-line startup idea", min_length=5, max_length=2000)
+    problem: str = Field(default="", description="The problem being solved", max_length=4000)
+    solution: str = Field(default="", description="How the product solves it", max_length=4000)
     product_specs: str = Field(
         default="",
         description="Technical details, features, target platform, etc.",
+        max_length=4000,
     )
     deep_mode: bool = Field(
         default=False,
@@ -31,9 +31,9 @@ class SignalThread(BaseModel):
     relevance_score: int = 0
     signal_type: str = ""
     insight: str = ""
-    competing_products: list[str] = []
-    unmet_needs: list[str] = []
-    key_quotes: list[str] = []
+    competing_products: list[str] = Field(default_factory=list)
+    unmet_needs: list[str] = Field(default_factory=list)
+    key_quotes: list[str] = Field(default_factory=list)
     source_query: str = ""
 
 
@@ -48,11 +48,11 @@ class Scores(BaseModel):
 class AnalysisResponse(BaseModel):
     """Full response from the engine."""
     report: str = ""
-    scores: Scores = Scores()
-    threads: list[SignalThread] = []
+    scores: Scores = Field(default_factory=Scores)
+    threads: list[SignalThread] = Field(default_factory=list)
     iterations: int = 0
-    queries_used: list[str] = []
-    coverage: dict = {}
+    queries_used: list[str] = Field(default_factory=list)
+    coverage: dict = Field(default_factory=dict)
     elapsed_seconds: float = 0.0
 
 
@@ -60,3 +60,58 @@ class StatusUpdate(BaseModel):
     """Server-Sent Event payload."""
     stage: str
     detail: str
+
+
+# ── LLM output schemas ───────────────────────────────────
+# Validated in engine.py so malformed model output is caught (and retried)
+# at the stage that produced it.
+
+class SearchQuery(BaseModel):
+    """A Reddit search query produced by query generation / refinement."""
+    query: str = Field(..., min_length=1)
+    intent: str = "demand"
+    subreddits: list[str] = Field(default_factory=list)
+
+
+class ThreadAnalysis(BaseModel):
+    """The model's verdict on a single thread."""
+    thread_id: str = Field(..., min_length=1)
+    relevance_score: int = 0
+    signal_type: str = "irrelevant"
+    insight: str = ""
+    competing_products: list[str] = Field(default_factory=list)
+    unmet_needs: list[str] = Field(default_factory=list)
+    key_quotes: list[str] = Field(default_factory=list)
+
+
+class SynthesisResult(BaseModel):
+    """The final report and its scores.
+
+    Each field is coerced on its own, so one odd value doesn't throw away the
+    whole report: a report returned as an object is flattened to markdown, and
+    scores are rounded to ints with unusable ones dropped.
+    """
+    report: str
+    scores: dict[str, int] = Field(default_factory=dict)
+
+    @field_validator("report", mode="before")
+    @classmethod
+    def _report_text(cls, v):
+        if isinstance(v, dict):
+            return "\n\n".join(f"## {k}\n\n{section}" for k, section in v.items())
+        if isinstance(v, list):
+            return "\n\n".join(str(section) for section in v)
+        return v
+
+    @field_validator("scores", mode="before")
+    @classmethod
+    def _int_scores(cls, v):
+        if not isinstance(v, dict):
+            return {}
+        scores = {}
+        for k, score in v.items():
+            try:
+                scores[str(k)] = round(float(score))
+            except (TypeError, ValueError, OverflowError):
+                continue
+        return scores
@@ -3,6 +3,21 @@ Prompt templates for the agentic Reddit signal engine.
 All ChatGPT system/user prompts live here for easy tuning.
 """
 
+# ─────────────────────────────────────────────────────────
+# Shared startup context
+# Identical for every call in a run, so it is appended to the system message
+# (the static prefix) and the per-call data goes in the user message. This
+# keeps the prompt prefix byte-identical and lets OpenAI prompt caching hit.
+# ─────────────────────────────────────────────────────────
+STARTUP_CONTEXT = """\
+--- STARTUP CONTEXT ---
+Idea:          {idea}
+Problem:       {problem}
+Solution:      {solution}
+Product Specs: {product_specs}
+--- END STARTUP CONTEXT ---
+"""
+
 # ─────────────────────────────────────────────────────────
 # STAGE 1 — Query Generation
 # ─────────────────────────────────────────────────────────
@@ -59,19 +74,12 @@ Be brutally honest. If a thread is irrelevant, say so. Founders need truth, not
 """
 
 ANALYSIS_USER = """\
---- STARTUP CONTEXT ---
-Idea:          {idea}
-Problem:       {problem}
-Solution:      {solution}
-Product Specs: {product_specs}
---- END STARTUP CONTEXT ---
+Below are Reddit threads grouped into batches by the search query that
+retrieved them. Each batch gives the query and the intent of that search.
 
-Below are Reddit threads retrieved for the search query: "{query}"
-Intent of this search: {intent}
-
---- THREADS ---
-{threads_json}
---- END THREADS ---
+--- BATCHES ---
+{batches_json}
+--- END BATCHES ---
 
 For each thread, return a JSON object with:
   "thread_id": "<the id from input>",
@@ -99,13 +107,6 @@ that will fill those gaps. Think about:
 """
 
 REFINEMENT_USER = """\
---- STARTUP CONTEXT ---
-Idea:          {idea}
-Problem:       {problem}
-Solution:      {solution}
-Product Specs: {product_specs}
---- END STARTUP CONTEXT ---
-
 Here is a summary of what we've found so far across {total_threads} threads:
 
 Signal distribution:
@@ -139,13 +140,6 @@ Be evidence-based, cite specific threads, and be brutally honest.
 """
 
 SYNTHESIS_USER = """\
---- STARTUP CONTEXT ---
-Idea:          {idea}
-Problem:       {problem}
-Solution:      {solution}
-Product Specs: {product_specs}
---- END STARTUP CONTEXT ---
-
 Below are ALL analyzed Reddit signals (already scored and classified):
 
 {all_signals_json}
@@ -167,7 +161,7 @@ Also return structured scores:
   - overall_failure_probability (0-100)
 
 Return your response as JSON with:
-  "report": {{ the markdown report above }},
+  "report": "<the markdown report above, as a single JSON string>",
   "scores": {{
     "demand_score": <int>,
     "competition_risk": <int>,
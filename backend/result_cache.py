@@ -0,0 +1,99 @@
+"""
+Optional Redis cache in front of the slow upstream calls (Gemini keywords,
+GitHub search, the Reddit signal engine) and of whole analysis results.
+Enabled only when REDIS_URL is set and the `redis` package is installed;
+otherwise every lookup is a miss and the wrapped call runs as usual.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+KW_TTL = int(os.getenv("KW_TTL", "86400"))            # keyword extraction
+GH_TTL = int(os.getenv("GH_TTL", "3600"))             # GitHub search results
+REDDIT_TTL = int(os.getenv("REDDIT_TTL", "1800"))     # full Reddit engine runs
+ANALYZE_TTL = int(os.getenv("ANALYZE_TTL", "21600"))  # whole analysis results
+
+ENVELOPE_VERSION = 1
+
+_REDIS = None
+_REDIS_DISABLED = not REDIS_URL
+
+
+def make_key(namespace: str, *parts: str) -> str:
+    """Namespaced sha256 key over the given parts."""
+    digest = hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+    return f"prune:{namespace}:{digest}"
+
+
+def _redis():
+    global _REDIS, _REDIS_DISABLED
+    if _REDIS is None and not _REDIS_DISABLED:
+        try:
+            import redis.asyncio as aioredis
+
+            _REDIS = aioredis.from_url(REDIS_URL)
+        except ImportError:
+            logger.warning("REDIS_URL is set but the redis package is not installed")
+            _REDIS_DISABLED = True
+    return _REDIS
+
+
+def enabled() -> bool:
+    """True when a Redis backend is configured and importable."""
+    return _redis() is not None
+
+
+async def get(key: str) -> Any:
+    """Return the cached payload for `key`, or None on a miss or when disabled."""
+    r = _redis()
+    if r is None:
+        return None
+    try:
+        raw = await r.get(key)
+        if raw is not None:
+            envelope = orjson.loads(raw)
+            if envelope.get("v") == ENVELOPE_VERSION:
+                return envelope["payload"]
+    except Exception as e:
+        logger.warning(f"Redis get failed for {key}: {e}")
+    return None
+
+
+async def set(key: str, ttl: int, payload: Any) -> None:
+    """Store `payload` under `key` for `ttl` seconds; a no-op when disabled."""
+    r = _redis()
+    if r is None:
+        return
+    try:
+        envelope = {"v": ENVELOPE_VERSION, "ts": time.time(), "payload": payload}
+        await r.setex(key, ttl, orjson.dumps(envelope))
+    except Exception as e:
+        logger.warning(f"Redis set failed for {key}: {e}")
+
+
+async def cached(key: str, ttl: int, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """Return the cached payload for `key`, or await fn() and cache its result."""
+    if not enabled():
+        return await fn()
+    result = await get(key)
+    if result is None:
+        result = await fn()
+        await set(key, ttl, result)
+    return result
+
+
+async def close() -> None:
+    """Close the Redis connection pool (called on app shutdown)."""
+    global _REDIS
+    if _REDIS is not None:
+        await _REDIS.aclose()
+        _REDIS = None
@@ -5,12 +5,17 @@ Run with:
     pytest test_api.py -v --tb=short   (shorter tracebacks)
 """
 
+import asyncio
 import pytest
 from httpx import AsyncClient, ASGITransport
 from unittest.mock import AsyncMock, patch
 
+import main
 from main import app
-from models import StartupInput, SignalThread, Scores, AnalysisResponse, StatusUpdate
+from models import (
+    StartupInput, SignalThread, Scores, AnalysisResponse, StatusUpdate,
+    SearchQuery, ThreadAnalysis,
+)
 from mock_data import (
     SAMPLE_INPUTS,
     MOCK_ENGINE_RESULT,
@@ -59,6 +64,12 @@ class TestModels:
         with pytest.raises(Exception):
             StartupInput(idea="Hi", problem="Ok", solution="Yep")
 
+    def test_startup_input_max_length(self):
+        with pytest.raises(Exception):
+            StartupInput(idea="x" * 2001, problem="Ok", solution="Yep")
+        with pytest.raises(Exception):
+            StartupInput(idea="AI resume screener", problem="x" * 4001)
+
     def test_startup_input_optional_specs(self):
         inp = StartupInput(
             idea="AI resume screener",
@@ -104,6 +115,20 @@ class TestModels:
         s = StatusUpdate(stage="searching", detail="Searching Reddit...")
         assert s.stage == "searching"
 
+    def test_search_query_from_mock(self):
+        q = SearchQuery(**MOCK_GENERATED_QUERIES[0])
+        assert q.query
+        assert q.intent in ("pain_point", "competition", "demand", "skepticism")
+
+    def test_search_query_requires_query(self):
+        with pytest.raises(Exception):
+            SearchQuery(intent="demand")
+
+    def test_thread_analysis_coerces_score(self):
+        a = ThreadAnalysis(thread_id="abc123", relevance_score="85")
+        assert a.relevance_score == 85
+        assert a.signal_type == "irrelevant"
+
 
 # ─────────────────────────────────────────────────────────
 # Health & Root Endpoint Tests
@@ -318,6 +343,70 @@ class TestAnalyzeEndpoint:
             assert "OpenAI API error" in resp.json()["detail"]
 
 
+# ─────────────────────────────────────────────────────────
+# POST /analyze/batch Tests
+# ─────────────────────────────────────────────────────────
+class TestBatchEndpoint:
+
+    @pytest.mark.anyio
+    async def test_batch_empty_list(self, client):
+        """POST /analyze/batch with no ideas should return 422."""
+        resp = await client.post("/analyze/batch", json={"ideas": []})
+        assert resp.status_code == 422
+
+    @pytest.mark.anyio
+    async def test_batch_too_many_ideas(self, client):
+        """POST /analyze/batch caps the batch at 10 ideas."""
+        resp = await client.post("/analyze/batch", json={"ideas": SAMPLE_INPUTS[:1] * 11})
+        assert resp.status_code == 422
+
+    @pytest.mark.anyio
+    async def test_batch_reports_a_cancelled_idea(self, client):
+        """A cancelled item is reported as an error, not serialized as an exception."""
+        async def analyze(body):
+            if body.idea.startswith("Cancelled"):
+                raise asyncio.CancelledError()
+            return {"idea": body.idea}
+
+        ideas = [{"idea": "Cancelled idea here"}, {"idea": "Meal planner for shift workers"}]
+        with patch("main.analyze", analyze):
+            resp = await client.post("/analyze/batch", json={"ideas": ideas})
+        assert resp.status_code == 200
+        out = resp.json()
+        assert out[0]["error"] == "CancelledError"
+        assert out[1]["result"] == {"idea": "Meal planner for shift workers"}
+
+    @pytest.mark.anyio
+    async def test_batch_isolates_a_failing_idea(self, client):
+        """One idea's GitHub error is reported in place; the others still succeed."""
+        from fastapi import HTTPException
+
+        async def github_analysis(idea, keywords=None):
+            if idea.startswith("Broken"):
+                raise HTTPException(status_code=403, detail="GitHub API rate limit exceeded or bad token.")
+            return {
+                "keywords": ["resume"],
+                "query": "resume in:name,description",
+                "result": {"total_count": 0, "items": []},
+                "repo_analysis": main.filter_score_repos(idea, ["resume"], []),
+            }
+
+        ideas = [
+            {"idea": "AI resume screener for recruiters"},
+            {"idea": "Broken idea that GitHub rejects"},
+            {"idea": "Meal planner for shift workers"},
+        ]
+        with patch("main._github_analysis", github_analysis), \
+                patch("main._websearch_analysis", new_callable=AsyncMock, return_value={"companies": []}):
+            resp = await client.post("/analyze/batch", json={"ideas": ideas})
+        assert resp.status_code == 200
+        out = resp.json()
+        assert [o["input"]["idea"] for o in out] == [i["idea"] for i in ideas]
+        assert "result" in out[0] and "result" in out[2]
+        assert out[1]["error"] == "GitHub API rate limit exceeded or bad token."
+        assert "result" not in out[1]
+
+
 # ─────────────────────────────────────────────────────────
 # POST /analyze/stream Tests
 # ─────────────────────────────────────────────────────────
@@ -397,3 +486,457 @@ class TestMockDataIntegrity:
         ]
         for section in required_sections:
             assert section in MOCK_REPORT, f"Missing report section: {section}"
+
+
+# ─────────────────────────────────────────────────────────
+# Pipeline Helper Tests
+# ─────────────────────────────────────────────────────────
+class FakeRedis:
+    """Just enough of redis.asyncio for result_cache."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch("result_cache._redis", return_value=redis):
+        yield redis
+
+
+class TestKeywordCaching:
+
+    @pytest.mark.anyio
+    async def test_gemini_keywords_are_cached(self, fake_redis):
+        with patch("main.gemini_keywords", new_callable=AsyncMock) as gemini:
+            gemini.return_value = ["resume", "screening"]
+            assert await main._keywords("AI resume screener") == ["resume", "screening"]
+            assert await main._keywords("AI resume screener") == ["resume", "screening"]
+        assert gemini.await_count == 1
+
+    @pytest.mark.anyio
+    async def test_fallback_keywords_are_not_cached(self, fake_redis):
+        with patch("main.gemini_keywords", new_callable=AsyncMock) as gemini:
+            gemini.return_value = None
+            keywords = await main._keywords("AI resume screener")
+            assert keywords == main.fallback_keywords("AI resume screener")
+            await main._keywords("AI resume screener")
+        assert gemini.await_count == 2
+        assert fake_redis.store == {}
+
+
+class TestAnalysisCacheKey:
+
+    @pytest.mark.anyio
+    def test_key_covers_problem_solution_and_specs(self):
+        base = StartupInput(idea="AI resume screener", problem="slow hiring")
+        variants = [
+            base,
+            base.model_copy(update={"problem": "biased hiring"}),
+            base.model_copy(update={"solution": "LLM ranking"}),
+            base.model_copy(update={"product_specs": "Chrome extension"}),
+            base.model_copy(update={"deep_mode": True}),
+        ]
+        keywords = ["resume", "screening"]
+        keys = [main._analysis_cache_key(v, keywords) for v in variants]
+        assert main._analysis_cache_key(base.model_copy(), ["Screening", "resume"]) == keys[0]
+        assert len(set(keys)) == len(variants)
+
+    @pytest.mark.anyio
+    async def test_slow_gemini_does_not_block_the_lookup(self, fake_redis):
+        """With the cache on, keywords are resolved once, within the Gemini timeout."""
+        calls = 0
+
+        async def slow_keywords(idea):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(1)
+            return ["gemini"]
+
+        search = AsyncMock(return_value={"items": [], "total_count": 0})
+        with patch("main._keywords", slow_keywords), patch("main._github_search", search), \
+                patch("main._websearch_analysis", new_callable=AsyncMock, return_value={"companies": []}), \
+                patch("main.GEMINI_KEYWORD_TIMEOUT_S", 0.01):
+            result = await asyncio.wait_for(
+                main._analyze(StartupInput(idea="AI resume screener")), timeout=0.5)
+        assert result["keywords"] == main.fallback_keywords("AI resume screener")
+        assert calls == 1
+
+
+class TestRepoScoring:
+
+    REPOS = [
+        {"name": "node-speech", "description": "Speech-to-text bindings for node.js apps", "stars": 50},
+        {"name": "toolbox", "description": "Node utilities for JS developers everywhere", "stars": 40},
+        {"name": "tts", "description": "Text to speech engine, and speech synthesis", "stars": 30},
+        {"name": "my_tool", "description": "A command line helper for developers", "stars": 20},
+        {"name": "whisper-node", "description": "Offline speech to text transcription in Node.js", "stars": 10},
+    ]
+    KEYWORDS = ["node.js", "speech-to-text", "tool"]
+
+    def test_multi_word_terms_match_in_order_only(self):
+        from github_client import filter_score_repos
+        result = filter_score_repos("Offline transcription tool for developers", self.KEYWORDS, self.REPOS)
+        scores = {r["name"]: r["match_score"] for r in result["top_matches"]}
+        assert scores == {"whisper-node": 8, "node-speech": 6, "toolbox": 1, "my_tool": 1}
+        assert result["high_sim_count"] == 2
+        assert result["total_scored"] == 4
+
+    def test_relevance_uses_whole_terms(self):
+        from github_client import compute_relevance
+        assert compute_relevance(self.KEYWORDS, self.REPOS) == 0.4
+
+
+class TestGeminiTimeout:
+
+    @pytest.mark.anyio
+    async def test_slow_gemini_finishes_in_background(self):
+        finished = asyncio.Event()
+
+        async def slow_keywords(idea):
+            await asyncio.sleep(0.05)
+            finished.set()
+            return ["gemini"]
+
+        search = AsyncMock(return_value={"items": [], "total_count": 0})
+        with patch("main._keywords", slow_keywords), patch("main._github_search", search), \
+                patch("main.GEMINI_KEYWORD_TIMEOUT_S", 0.01):
+            github = await main._github_analysis("AI resume screener")
+            assert github["keywords"] == main.fallback_keywords("AI resume screener")
+            await asyncio.wait_for(finished.wait(), timeout=1)
+
+
+def _thread(tid: str, title: str) -> dict:
+    return {
+        "id": tid, "title": title, "selftext": "", "subreddit": "startups",
+        "score": 10, "num_comments": 2, "url": f"https://reddit.com/{tid}",
+    }
+
+
+class TestAnalyzeThreads:
+
+    @pytest.mark.anyio
+    async def test_invalid_item_drops_only_that_thread(self):
+        import engine
+        raw = (
+            '[{"thread_id": "a", "relevance_score": 80, "signal_type": "pain_point"},'
+            ' {"thread_id": "b", "relevance_score": "very"}]'
+        )
+        with patch("engine.call_openai", new_callable=AsyncMock, return_value=raw):
+            signals = await engine.analyze_threads(
+                None, "ctx", [("q", "pain", [_thread("a", "First"), _thread("b", "Second")])]
+            )
+        assert [s["thread_id"] for s in signals] == ["a"]
+        assert signals[0]["source_query"] == "q"
+
+
+class TestWeightedTerms:
+
+    def test_keyword_that_is_also_an_idea_word_scores_once(self):
+        from github_client import filter_score_repos
+        repos = [{"name": "resume-kit", "description": "Resume parsing library for recruiters"}]
+        result = filter_score_repos("resume parsing service", ["resume"], repos)
+        # resume: keyword (3), not keyword + idea word (4); parsing: idea word (1)
+        assert result["top_matches"][0]["match_score"] == 4
+
+
+class TestCircuitBreaker:
+
+    @pytest.mark.anyio
+    async def test_opens_fails_fast_and_recovers(self):
+        from circuit_breaker import CircuitBreaker, CircuitOpenError
+        breaker = CircuitBreaker("test", fail_max=2, reset_timeout=0.05)
+        upstream = AsyncMock(side_effect=RuntimeError("down"))
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await breaker.call(upstream)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(upstream)
+        assert upstream.await_count == 2
+
+        # Half-open: one trial call goes through and closes the breaker
+        await asyncio.sleep(0.06)
+        upstream.side_effect = None
+        upstream.return_value = "ok"
+        assert await breaker.call(upstream) == "ok"
+        assert breaker.opened_at is None and breaker.failures == 0
+
+    @pytest.mark.anyio
+    async def test_failed_trial_reopens(self):
+        from circuit_breaker import CircuitBreaker, CircuitOpenError
+        breaker = CircuitBreaker("test", fail_max=1, reset_timeout=0.05)
+        upstream = AsyncMock(side_effect=RuntimeError("down"))
+        with pytest.raises(RuntimeError):
+            await breaker.call(upstream)
+        await asyncio.sleep(0.06)
+        with pytest.raises(RuntimeError):
+            await breaker.call(upstream)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(upstream)
+        assert upstream.await_count == 2
+
+    @pytest.mark.anyio
+    async def test_non_failure_during_trial_closes(self):
+        from circuit_breaker import CircuitBreaker
+        breaker = CircuitBreaker(
+            "test", fail_max=1, reset_timeout=0.05, is_failure=lambda e: isinstance(e, RuntimeError))
+        upstream = AsyncMock(side_effect=RuntimeError("down"))
+        with pytest.raises(RuntimeError):
+            await breaker.call(upstream)
+        await asyncio.sleep(0.06)
+        upstream.side_effect = ValueError("client error")
+        with pytest.raises(ValueError):
+            await breaker.call(upstream)
+        assert breaker.opened_at is None
+        upstream.side_effect = None
+        upstream.return_value = "ok"
+        assert await breaker.call(upstream) == "ok"
+
+    @pytest.mark.anyio
+    async def test_ignores_non_failures(self):
+        from circuit_breaker import CircuitBreaker
+        breaker = CircuitBreaker("test", fail_max=1, is_failure=lambda e: False)
+        upstream = AsyncMock(side_effect=ValueError("client error"))
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await breaker.call(upstream)
+        assert breaker.opened_at is None
+
+
+class TestGitHubRateLimit:
+
+    @staticmethod
+    def _client_for(responses):
+        import httpx
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return responses[len(calls) - 1]
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler)), calls
+
+    @pytest.mark.anyio
+    async def test_retries_after_rate_limit(self):
+        import httpx
+        import github_client
+        client, calls = self._client_for([
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"total_count": 1, "items": [{"full_name": "a/b"}]}),
+        ])
+        with patch("github_client._client", return_value=client), \
+                patch("github_client._RATE_LIMITER", github_client.GitHubRateLimiter()), \
+                patch("github_client.random.uniform", return_value=0):
+            result = await github_client.search_github("retry-after-test")
+        assert len(calls) == 2
+        assert result["items"][0]["name"] == "a/b"
+
+    @pytest.mark.anyio
+    async def test_bad_token_fails_without_retry(self):
+        import httpx
+        import github_client
+        from fastapi import HTTPException
+        client, calls = self._client_for([httpx.Response(403)])
+        with patch("github_client._client", return_value=client), \
+                patch("github_client._RATE_LIMITER", github_client.GitHubRateLimiter()):
+            with pytest.raises(HTTPException) as exc:
+                await github_client.search_github("bad-token-test")
+        assert exc.value.status_code == 403
+        assert len(calls) == 1
+
+    @pytest.mark.anyio
+    async def test_fails_fast_when_reset_is_far_away(self):
+        import time
+        import github_client
+        from fastapi import HTTPException
+        limiter = github_client.GitHubRateLimiter()
+        limiter.remaining = 0
+        limiter.reset_at = time.time() + 3600
+        client, calls = self._client_for([])
+        with patch("github_client._client", return_value=client), \
+                patch("github_client._RATE_LIMITER", limiter):
+            with pytest.raises(HTTPException) as exc:
+                await github_client.search_github("exhausted-test")
+        assert exc.value.status_code == 403
+        assert calls == []
+
+
+class TestCoalesce:
+
+    @pytest.mark.anyio
+    async def test_concurrent_callers_share_one_run(self):
+        runs = 0
+
+        async def work():
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0.01)
+            return {"runs": runs}
+
+        results = await asyncio.gather(*(main._coalesce("same", work) for _ in range(3)))
+        assert runs == 1
+        assert results == [{"runs": 1}] * 3
+        assert "same" not in main._INFLIGHT
+
+        # A later call with the same key starts a fresh run
+        await main._coalesce("same", work)
+        assert runs == 2
+
+    @pytest.mark.anyio
+    async def test_cancelled_caller_does_not_cancel_the_run(self):
+        done = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            done.set()
+            return "ok"
+
+        first = asyncio.ensure_future(main._coalesce("shared", work))
+        second = asyncio.ensure_future(main._coalesce("shared", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "ok"
+        assert done.is_set()
+
+
+class TestGroupForAnalysis:
+
+    def test_packs_small_queries_and_isolates_large_ones(self):
+        import engine
+        queries = [
+            {"query": "a", "intent": "pain"},
+            {"query": "b", "intent": "demand"},
+            {"query": "empty"},
+            {"query": "big"},
+            {"query": "c"},
+        ]
+        results = {
+            "a": [_thread("a1", "A1"), _thread("a2", "A2")],
+            "b": [_thread("b1", "B1")],
+            "empty": [],
+            "big": [_thread(f"g{i}", f"G{i}") for i in range(5)],
+            "c": [_thread("c1", "C1")],
+        }
+        groups = engine.group_for_analysis(queries, results, max_threads=3)
+        assert [[q for q, _, _ in g] for g in groups] == [["a", "b"], ["big"], ["c"]]
+        assert groups[0][0][1] == "pain"
+        assert groups[2][0][1] == "demand"  # default intent
+
+    def test_no_threads_no_groups(self):
+        import engine
+        assert engine.group_for_analysis([{"query": "a"}], {"a": []}) == []
+
+
+class TestEvaluateCoverage:
+
+    def test_incremental_matches_full_recount(self):
+        import engine
+        first = [
+            {"signal_type": "pain_point", "competing_products": ["Lever"]},
+            {"signal_type": "demand"},
+        ]
+        second = [
+            {"signal_type": "pain_point", "competing_products": ["Greenhouse", "Lever"]},
+            {"signal_type": "irrelevant"},
+        ]
+        prior = engine.evaluate_coverage(first)
+        incremental = engine.evaluate_coverage(second, prior=prior)
+        full = engine.evaluate_coverage(first + second)
+        assert incremental["counts"] == full["counts"]
+        assert sorted(incremental["competitors"]) == sorted(full["competitors"]) == ["Greenhouse", "Lever"]
+        assert incremental["gaps"] == full["gaps"]
+        assert incremental["has_gaps"] is True
+
+    def test_prior_is_not_mutated(self):
+        import engine
+        prior = engine.evaluate_coverage([{"signal_type": "demand"}])
+        engine.evaluate_coverage([{"signal_type": "demand"}], prior=prior)
+        assert prior["counts"]["demand"] == 1
+
+
+class TestSynthesizeReport:
+
+    @pytest.mark.anyio
+    async def test_odd_fields_keep_the_report(self):
+        import engine
+        raw = (
+            '{"report": {"Summary": "Crowded market.", "Recommendation": "Pivot"},'
+            ' "scores": {"demand_score": 72.5, "competition_risk": "80", "pain_validation": "high"}}'
+        )
+        with patch("engine.call_openai", new_callable=AsyncMock, return_value=raw) as call:
+            result = await engine.synthesize_report(None, "ctx", [])
+        assert call.await_count == 1
+        assert result["report"] == "## Summary\n\nCrowded market.\n\n## Recommendation\n\nPivot"
+        assert result["scores"] == {"demand_score": 72, "competition_risk": 80}
+
+
+class TestKeywordDiskCache:
+
+    @pytest.fixture
+    def kw_cache(self, tmp_path):
+        import keyword_cache
+        from jsonl_cache import JsonlCache
+        cache = JsonlCache(str(tmp_path / "kw.jsonl"), "Keyword cache", keyword_cache._is_valid, max_entries=3)
+        with patch("keyword_cache._CACHE", cache):
+            yield keyword_cache
+
+    def test_disabled_without_a_path(self):
+        import keyword_cache
+        from jsonl_cache import JsonlCache
+        with patch("keyword_cache._CACHE", JsonlCache("", "Keyword cache", keyword_cache._is_valid)):
+            keyword_cache.set("k", ["a"])
+            assert keyword_cache.get("k") is None
+
+    def test_keeps_newest_entries_and_compacts_the_file(self, kw_cache, tmp_path):
+        for i in range(8):
+            kw_cache.set(f"k{i}", [f"w{i}"])
+        assert kw_cache.get("k0") is None
+        assert kw_cache.get("k7") == ["w7"]
+        lines = (tmp_path / "kw.jsonl").read_bytes().splitlines()
+        assert len(lines) < 2 * kw_cache._CACHE.max_entries
+
+        # A fresh process loads only the newest entries back
+        from jsonl_cache import JsonlCache
+        reloaded = JsonlCache(str(tmp_path / "kw.jsonl"), "Keyword cache", kw_cache._is_valid, max_entries=3)
+        assert reloaded.get("k7") == ["w7"]
+        assert list(reloaded._load()) == ["k5", "k6", "k7"]
+
+
+class TestSafeParseJson:
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("raw", [
+        '{"a": 1}',
+        '```json\n{"a": 1}\n```',
+        '```\n{"a": 1}\n```',
+        '```{"a": 1}```',
+        '```json {"a": 1}```',
+    ])
+    async def test_strips_fences(self, raw):
+        import engine
+        assert await engine.safe_parse_json(raw) == {"a": 1}
+
+
+class TestLoopBoundSemaphores:
+
+    def test_each_event_loop_gets_its_own_semaphore(self):
+        import github_client
+
+        async def contend():
+            sem = github_client._github_sem()
+            # More holders than permits forces the semaphore to bind to this loop
+            async def hold():
+                async with sem:
+                    await asyncio.sleep(0)
+            await asyncio.gather(*(hold() for _ in range(github_client.GITHUB_CONCURRENCY + 2)))
+            return sem
+
+        assert asyncio.run(contend()) is not asyncio.run(contend())
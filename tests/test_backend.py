@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 
@@ -6,12 +7,12 @@ from fastapi.testclient import TestClient
 
 from backend.main import (
     app,
-    extract_keywords,
     compute_competition_risk,
     compute_relevance,
     compute_top_matches,
     build_github_query,
 )
+from backend.github_client import extract_keywords_async
 
 
 client = TestClient(app)
@@ -43,7 +44,7 @@ def test_compute_relevance():
 
 def test_extract_keywords_fallback():
     # with no GEMINI_API_KEY the function should still return first 5 words
-    kw = extract_keywords("this is a very simple idea example for test")
+    kw = asyncio.run(extract_keywords_async("this is a very simple idea example for test"))
     assert isinstance(kw, list)
     assert len(kw) <= 5
 
@@ -130,16 +131,16 @@ def test_analyze_with_mock(monkeypatch):
     # simulate extraction and github search so test doesn't depend on network
     monkeypatch.setenv("GITHUB_TOKEN", "fake")
 
-    def fake_extract(text):
+    async def fake_extract(text):
         return ["foo", "bar"]
 
-    def fake_search(q):
+    async def fake_search(q):
         return {"total_count": 2, "items": [
             {"name": "foo-project", "description": "contains foo"},
             {"name": "unrelated", "description": "no match"},
         ]}
 
-    monkeypatch.setattr("backend.main.extract_keywords", fake_extract)
+    monkeypatch.setattr("backend.main.gemini_keywords", fake_extract)
     monkeypatch.setattr("backend.main.search_github", fake_search)
 
     res = client.post("/analyze", json={"idea": "doesn' matter"})